@@ -0,0 +1,102 @@
+"""
+Бенчмарк DI: сколько объектов и памяти выделяется на апдейт при разрешении
+зависимостей хендлера — Factory (как было) против Singleton (как сейчас).
+
+Хендлер-заглушка с @inject получает UserService, как mita_handler;
+тот же граф, собранный на Factory, воспроизводит прежний контейнер.
+
+    uv run scripts/bench_di_allocations.py --updates 10000
+"""
+import argparse
+import asyncio
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from aiogram import Bot  # noqa: E402
+from dependency_injector import providers  # noqa: E402
+from dependency_injector.wiring import Provide, inject  # noqa: E402
+
+from src.bot.containers import Container  # noqa: E402
+from src.bot.repositories import UserRepository  # noqa: E402
+from src.bot.services import UserService  # noqa: E402
+from src.bot.services.model_services.ai_service import AiService  # noqa: E402
+
+
+@inject
+async def handler(
+    update: int,
+    user_service: UserService = Provide[Container.user_service]
+) -> UserService:
+    return user_service
+
+
+def factory_graph(container: Container) -> providers.Provider:
+    """Прежний граф: репозиторий, AiService и UserService создаются на каждый вызов."""
+    user_repo = providers.Factory(
+        UserRepository,
+        cache=container.user_cache,
+        blocked=container.blocked_users
+    )
+    ai_service = providers.Factory(
+        AiService,
+        pool=container.ai_pool,
+        context=container.context_builder
+    )
+    return providers.Factory(
+        UserService,
+        user_repository=user_repo,
+        ai_service=ai_service,
+        tts_client=container.tts_client,
+        audio_cache=container.audio_cache,
+        voice_uploader=container.voice_uploader,
+        media=container.media_executor,
+        image_cache=container.image_cache,
+        sticker_repository=container.sticker_repo
+    )
+
+
+async def run(updates: int) -> tuple[float, int, int]:
+    # Прогрев: синглтоны зависимостей создаются до замера
+    for update in range(10):
+        await handler(update)
+    gc.collect()
+
+    tracemalloc.start()
+    start_blocks = sys.getallocatedblocks()
+    start = time.perf_counter()
+
+    kept = [await handler(update) for update in range(updates)]
+
+    elapsed = time.perf_counter() - start
+    blocks = sys.getallocatedblocks() - start_blocks
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return elapsed, blocks, size
+
+
+def measure(name: str, container: Container, updates: int) -> None:
+    elapsed, blocks, size = asyncio.run(run(updates))
+    print(
+        f"{name:>9}: {elapsed / updates * 1e6:7.1f} мкс/апдейт, "
+        f"{blocks / updates:6.1f} блоков/апдейт, {size / updates:8.0f} байт/апдейт"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--updates", type=int, default=10000)
+    args = parser.parse_args()
+
+    container = Container(bot=Bot(token="42:bench"))
+    container.wire(modules=[__name__])
+
+    measure("singleton", container, args.updates)
+
+    with container.user_service.override(factory_graph(container)):
+        measure("factory", container, args.updates)
@@ -0,0 +1,134 @@
+"""
+Бенчмарк шардинга: сколько апдейтов в секунду обрабатывают N воркеров.
+
+Фронт (этот процесс) раскладывает синтетические апдейты по ProcessTransport,
+воркеры разбирают их через Dispatcher.feed_raw_update (модели aiogram,
+фильтры) и выполняют хендлер с заданной CPU-нагрузкой — вместо базы и ИИ.
+``local`` — то же самое в одном процессе через LocalTransport.
+
+    uv run scripts/bench_sharding.py --workers 1 2 4 --updates 20000 --work-ms 0.5
+"""
+import argparse
+import asyncio
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.bot.sharding import LocalTransport, ProcessTransport, serve_shard, split_by_shard  # noqa: E402
+
+
+def make_update(update_id: int, user_id: int) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 1_700_000_000,
+            "chat": {"id": user_id, "type": "private", "first_name": "bench"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "bench", "language_code": "ru"},
+            "text": f"привет, это сообщение номер {update_id}",
+        },
+    }
+
+
+def build_dispatcher(work_ms: float):
+    from aiogram import Bot, Dispatcher, F, Router
+    from aiogram.types import Message
+
+    router = Router()
+
+    @router.message(F.text)
+    async def handler(message: Message) -> None:
+        # Имитация CPU-работы хендлера (разбор документов, подготовка промпта)
+        deadline = time.perf_counter() + work_ms / 1000
+        while time.perf_counter() < deadline:
+            pass
+
+    dp = Dispatcher()
+    dp.include_router(router)
+    return dp, Bot(token="42:bench")
+
+
+async def consume(transport, shard: int, dp, bot) -> int:
+    handled = 0
+
+    async def feed(update: dict) -> None:
+        nonlocal handled
+        await dp.feed_raw_update(bot, update)
+        handled += 1
+
+    await serve_shard(transport, shard, feed)
+    await bot.session.close()
+    return handled
+
+
+def worker(transport, shard: int, work_ms: float, results) -> None:
+    # Импорт aiogram занимает секунды — до сигнала о готовности
+    dp, bot = build_dispatcher(work_ms)
+    results.put(("ready", shard))
+    handled = asyncio.run(consume(transport, shard, dp, bot))
+    results.put(("done", handled))
+
+
+async def produce(transport, updates: int, users: int) -> None:
+    # Пачками по 100, как отдаёт getUpdates
+    for first in range(1, updates + 1, 100):
+        page = [
+            make_update(update_id, 1_000_000 + update_id % users)
+            for update_id in range(first, min(first + 100, updates + 1))
+        ]
+        for shard, batch in split_by_shard(page, transport.shards).items():
+            await transport.send(shard, batch)
+    await transport.close()
+
+
+async def bench_local(updates: int, users: int, work_ms: float) -> tuple[float, int]:
+    dp, bot = build_dispatcher(work_ms)
+    transport = LocalTransport(1)
+    start = time.perf_counter()
+    _, handled = await asyncio.gather(
+        produce(transport, updates, users),
+        consume(transport, 0, dp, bot)
+    )
+    return time.perf_counter() - start, handled
+
+
+def bench_processes(workers: int, updates: int, users: int, work_ms: float) -> tuple[float, int]:
+    ctx = multiprocessing.get_context("spawn")
+    transport = ProcessTransport(workers)
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=worker, args=(transport, shard, work_ms, results))
+        for shard in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for _ in range(workers):
+        results.get()  # ждём запуска, чтобы не мерить старт процессов
+
+    start = time.perf_counter()
+    asyncio.run(produce(transport, updates, users))
+    handled = sum(results.get()[1] for _ in range(workers))
+    elapsed = time.perf_counter() - start
+
+    for process in processes:
+        process.join()
+    return elapsed, handled
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--updates", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--work-ms", type=float, default=0.5, help="CPU-время хендлера на апдейт")
+    args = parser.parse_args()
+
+    elapsed, handled = asyncio.run(bench_local(args.updates, args.users, args.work_ms))
+    print(f" local: {handled / elapsed:8.0f} upd/s ({handled} за {elapsed:.2f} с)")
+
+    for workers in args.workers:
+        elapsed, handled = bench_processes(workers, args.updates, args.users, args.work_ms)
+        print(f"{workers:>6}: {handled / elapsed:8.0f} upd/s ({handled} за {elapsed:.2f} с)")
@@ -0,0 +1,61 @@
+"""
+Бенчмарк поиска пользователя по user_id: с индексом и без.
+
+Создаёт временную базу, заполняет её пользователями, меряет find_one
+и проверяет через explain, что с индексом план — IXSCAN.
+
+    uv run scripts/bench_user_lookup.py --url mongodb://localhost:27017 --users 100000
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from pymongo import ASCENDING, AsyncMongoClient  # noqa: E402
+
+from src.bot.db.connection import plan_stages  # noqa: E402
+
+
+async def measure(users, ids: list[int], lookups: int) -> float:
+    start = time.perf_counter()
+    for _ in range(lookups):
+        await users.find_one({"user_id": random.choice(ids)})
+    return (time.perf_counter() - start) / lookups
+
+
+async def main(url: str, count: int, lookups: int) -> None:
+    client = AsyncMongoClient(url)
+    db = client["bench_user_lookup"]
+    users = db["users"]
+    await users.drop()
+
+    ids = random.sample(range(10**6, 10**10), count)
+    for i in range(0, count, 10000):
+        await users.insert_many(
+            [{"user_id": user_id, "settings": {"locale": "ru"}} for user_id in ids[i:i + 10000]]
+        )
+
+    for label in ("без индекса", "с индексом"):
+        if label == "с индексом":
+            await users.create_index([("user_id", ASCENDING)], unique=True)
+
+        explain = await users.find({"user_id": ids[0]}).explain()
+        stages = plan_stages(explain["queryPlanner"]["winningPlan"])
+        avg = await measure(users, ids, lookups)
+        print(f"{label}: {avg * 1000:.3f} ms/lookup, план: {sorted(stages)}")
+
+    await client.drop_database("bench_user_lookup")
+    await client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="mongodb://localhost:27017")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.url, args.users, args.lookups))
@@ -0,0 +1,76 @@
+"""
+Микро-бенчмарк эффектов для голосовых: старая функция против media.effects.
+
+Генерирует WAV заданной длины и сравнивает время и пик памяти.
+Прежний код кодировал в OGG/Vorbis, движок по умолчанию — в OGG/Opus,
+поэтому движок меряется с обоими кодеками: разница в скорости — это кодек.
+
+    uv run scripts/bench_voice_effects.py --seconds 10 60 300 --samplerate 24000
+"""
+import argparse
+import io
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+from pedalboard import Pedalboard, Reverb
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.media import effects  # noqa: E402
+
+
+def legacy_apply_voice_effect(voice_bytes: bytes) -> bytes:
+    """Копия прежнего UserService.apply_voice_effect."""
+    samples, samplerate = sf.read(io.BytesIO(voice_bytes), dtype='float32')
+    samples += np.random.normal(0, 0.00005, samples.shape).astype(np.float32)
+    board = Pedalboard([Reverb(room_size=0.01, damping=0.8, wet_level=0.1)])
+    processed = board(samples, samplerate)
+    out_buffer = io.BytesIO()
+    sf.write(out_buffer, processed, samplerate, format='OGG', subtype='VORBIS')
+    out_buffer.seek(0)
+    return out_buffer.read()
+
+
+def make_wav(seconds: float, samplerate: int) -> bytes:
+    t = np.arange(int(seconds * samplerate), dtype=np.float32) / samplerate
+    signal = 0.3 * np.sin(2 * np.pi * 220 * t) * (1 + 0.5 * np.sin(2 * np.pi * 3 * t))
+    out = io.BytesIO()
+    sf.write(out, signal, samplerate, format="WAV", subtype="PCM_16")
+    return out.getvalue()
+
+
+def measure(func, data: bytes, repeat: int) -> tuple[float, float, int]:
+    func(data)  # прогрев
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func(data)
+    elapsed = (time.perf_counter() - start) / repeat
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024, len(result)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, nargs="+", default=[10, 60, 300])
+    parser.add_argument("--samplerate", type=int, default=24000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for seconds in args.seconds:
+        data = make_wav(seconds, args.samplerate)
+        for name, func in (
+            ("legacy", legacy_apply_voice_effect),
+            ("opus", lambda data: effects.apply(data, codec="OPUS")),
+            ("vorbis", lambda data: effects.apply(data, codec="VORBIS")),
+        ):
+            elapsed, peak_mb, size = measure(func, data, args.repeat)
+            print(
+                f"{seconds:>6.0f}s {name:>8}: {elapsed * 1000:8.1f} ms, "
+                f"x{seconds / elapsed:7.1f} realtime, пик {peak_mb:6.1f} МБ, выход {size / 1024:.0f} КБ"
+            )
@@ -0,0 +1,69 @@
+"""
+Заглушка локального TTS сервера для проверки бота без настоящей модели.
+
+Повторяет протокол, который использует TtsClient:
+    POST /api/tts/async        -> {"task_id": ...}
+    GET  /api/task/{task_id}   -> {"status": "pending" | "completed", "output_file": ...}
+    GET  /api/download/{file}  -> WAV с тишиной
+
+Задержка генерации настраивается, чтобы сравнивать опрос и задержки по фазам:
+
+    uv run scripts/fake_tts_server.py --port 8000 --delay 0.8
+"""
+import argparse
+import io
+import time
+import uuid
+import wave
+
+from aiohttp import web
+
+
+def silence_wav(seconds: float, samplerate: int = 24000) -> bytes:
+    out = io.BytesIO()
+    with wave.open(out, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(samplerate)
+        wav.writeframes(b"\x00\x00" * int(seconds * samplerate))
+    return out.getvalue()
+
+
+def create_app(delay: float) -> web.Application:
+    tasks: dict[str, float] = {}
+    audio = silence_wav(1.0)
+
+    async def submit(request: web.Request) -> web.Response:
+        data = await request.post()
+        if not data.get("text"):
+            return web.json_response({"error": "empty text"}, status=400)
+        task_id = uuid.uuid4().hex
+        tasks[task_id] = time.monotonic() + delay
+        return web.json_response({"task_id": task_id})
+
+    async def status(request: web.Request) -> web.Response:
+        task_id = request.match_info["task_id"]
+        ready_at = tasks.get(task_id)
+        if ready_at is None:
+            return web.json_response({"status": "failed", "error": "unknown task"})
+        if time.monotonic() < ready_at:
+            return web.json_response({"status": "pending"})
+        return web.json_response({"status": "completed", "output_file": f"{task_id}.wav"})
+
+    async def download(request: web.Request) -> web.Response:
+        return web.Response(body=audio, content_type="audio/wav")
+
+    app = web.Application()
+    app.router.add_post("/api/tts/async", submit)
+    app.router.add_get("/api/task/{task_id}", status)
+    app.router.add_get("/api/download/{filename}", download)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--delay", type=float, default=0.8, help="время генерации, сек")
+    args = parser.parse_args()
+    web.run_app(create_app(args.delay), host=args.host, port=args.port)
@@ -0,0 +1,106 @@
+"""
+Проверка и починка коллекции users перед запуском бота.
+
+Уникальный индекс по user_id объявлен в модели User и создаётся Beanie при
+старте. В старых базах ему мешают дубли user_id (гонка в upsert до появления
+индекса) и такой же индекс под другим именем — тогда бот не стартует.
+
+Старый /ban сохранял settings.is_blocked строкой ("True"/"False"), а частичный
+индекс по is_blocked покрывает только bool — такие записи нужно привести к bool.
+
+Без флагов скрипт только показывает, что нашёл. С --fix:
+удаляет дубли (остаётся самый ранний документ), приводит is_blocked к bool,
+удаляет мешающие индексы по user_id и создаёт индекс из модели.
+
+    uv run scripts/migrate_users.py
+    uv run scripts/migrate_users.py --fix
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from pymongo import ASCENDING, AsyncMongoClient  # noqa: E402
+from pymongo.asynchronous.collection import AsyncCollection  # noqa: E402
+
+from src.bot.db.connection import plan_stages  # noqa: E402
+from src.bot.db.models import User  # noqa: E402
+from src.settings.main import config  # noqa: E402
+
+INDEX_NAME = "user_id_unique"
+
+
+async def duplicates(users: AsyncCollection, fix: bool) -> None:
+    groups = await (await users.aggregate([
+        {"$group": {"_id": "$user_id", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}}
+    ], allowDiskUse=True)).to_list()
+
+    extra = [doc_id for group in groups for doc_id in sorted(group["ids"])[1:]]
+    print(f"Дубли user_id: {len(groups)} пользователей, лишних документов: {len(extra)}")
+    for group in groups[:10]:
+        print(f"  user_id={group['_id']}: {group['count']} документов")
+
+    if fix and extra:
+        result = await users.delete_many({"_id": {"$in": extra}})
+        print(f"  удалено: {result.deleted_count}")
+
+
+async def blocked_flags(users: AsyncCollection, fix: bool) -> None:
+    for raw, value in (("True", True), ("False", False)):
+        query = {"settings.is_blocked": raw}
+        count = await users.count_documents(query)
+        print(f'is_blocked строкой "{raw}": {count}')
+        if fix and count:
+            result = await users.update_many(query, {"$set": {"settings.is_blocked": value}})
+            print(f"  исправлено: {result.modified_count}")
+
+
+async def indexes(users: AsyncCollection, fix: bool) -> None:
+    info = await users.index_information()
+    conflicting = [
+        name for name, spec in info.items()
+        if spec["key"] == [("user_id", ASCENDING)] and name != INDEX_NAME
+    ]
+    print(f"Индексы по user_id не из модели: {conflicting or 'нет'}")
+
+    if not fix:
+        return
+    for name in conflicting:
+        await users.drop_index(name)
+        print(f"  удалён: {name}")
+    if INDEX_NAME not in info:
+        await users.create_index([("user_id", ASCENDING)], name=INDEX_NAME, unique=True)
+        print(f"  создан: {INDEX_NAME}")
+
+
+async def main(url: str, db_name: str, fix: bool) -> None:
+    client = AsyncMongoClient(url)
+    users = client[db_name][User.Settings.name]
+
+    await duplicates(users, fix)
+    await blocked_flags(users, fix)
+    await indexes(users, fix)
+
+    explain = await users.find({"user_id": 0}).explain()
+    stages = plan_stages(explain["queryPlanner"]["winningPlan"])
+    print(f"План поиска по user_id: {sorted(stages)}")
+
+    explain = await users.find(
+        {"$or": [{"settings.is_blocked": True}, {"settings.is_blocked": "True"}]}
+    ).explain()
+    stages = plan_stages(explain["queryPlanner"]["winningPlan"])
+    print(f"План загрузки заблокированных: {sorted(stages)}")
+
+    await client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=config.db.url)
+    parser.add_argument("--db", default=config.db.name)
+    parser.add_argument("--fix", action="store_true", help="исправить, а не только показать")
+    args = parser.parse_args()
+    asyncio.run(main(args.url, args.db, args.fix))
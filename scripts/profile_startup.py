@@ -0,0 +1,67 @@
+"""
+Профиль холодного старта: сколько времени уходит на импорт бота и чего именно.
+
+Запускает ``python -X importtime`` в отдельном процессе (несколько раз,
+берётся медиана) и сводит собственное время импорта по пакетам верхнего уровня.
+
+    uv run scripts/profile_startup.py --module src.bot.app --runs 5 --top 15
+
+Время от запуска до первого апдейта бот пишет сам:
+метрики ``startup.ready`` и ``startup.first_update`` в логе.
+"""
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def profile(module: str) -> tuple[float, dict[str, float]]:
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True
+    )
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        sys.exit(result.stderr[-2000:])
+
+    by_package: dict[str, float] = defaultdict(float)
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, _, _, name = match.groups()
+            package = name.split(".")[0]
+            if package == "src":
+                package = ".".join(name.split(".")[:3])
+            by_package[package] += int(self_us) / 1_000_000
+    return wall, by_package
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="src.bot.app")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    walls = []
+    totals: dict[str, list[float]] = defaultdict(list)
+    for _ in range(args.runs):
+        wall, by_package = profile(args.module)
+        walls.append(wall)
+        for package, seconds in by_package.items():
+            totals[package].append(seconds)
+
+    medians = {package: statistics.median(values) for package, values in totals.items()}
+    print(f"import {args.module}: медиана {statistics.median(walls):.2f} с (процесс целиком), {args.runs} запусков")
+    for package, seconds in sorted(medians.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {seconds * 1000:8.0f} ms  {package}")
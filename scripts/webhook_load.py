@@ -0,0 +1,174 @@
+"""
+Нагрузочный стенд для webhook: шлёт синтетические апдейты и меряет
+задержку до ответа и сколько апдейтов в секунду выдерживает сервер.
+
+По умолчанию всё поднимается в одном процессе: webhook-приложение из
+src.bot.webhook с простым эхо-хендлером и заглушка Bot API, куда уходят
+ответы бота. Хендлер выполняется до ответа на POST (handle_in_background=False),
+так что задержка — полный путь апдейта через aiogram.
+
+    uv run scripts/webhook_load.py --concurrency 50 --duration 10
+
+Против запущенного бота (WEBHOOK_ENABLED=true, WEBHOOK_HANDLE_IN_BACKGROUND=false):
+
+    uv run scripts/webhook_load.py --url http://127.0.0.1:8080/webhook --secret ...
+"""
+import argparse
+import asyncio
+import itertools
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from aiohttp import ClientSession, web
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def make_update(update_id: int, user_id: int, text: str) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private", "first_name": "load"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "load"},
+            "text": text,
+        },
+    }
+
+
+def fake_bot_api() -> web.Application:
+    """Отвечает на любой метод Bot API так, будто сообщение отправлено."""
+    counter = itertools.count(1)
+
+    async def method(request: web.Request) -> web.Response:
+        data = await request.post()
+        return web.json_response({
+            "ok": True,
+            "result": {
+                "message_id": next(counter),
+                "date": int(time.time()),
+                "chat": {"id": int(data.get("chat_id", 0)), "type": "private"},
+                "text": data.get("text", ""),
+            },
+        })
+
+    app = web.Application()
+    app.router.add_post("/bot{token}/{method}", method)
+    return app
+
+
+async def start_local(port: int, secret: str) -> tuple[str, list[web.AppRunner]]:
+    from aiogram import Bot, Dispatcher, Router
+    from aiogram.client.session.aiohttp import AiohttpSession
+    from aiogram.client.telegram import TelegramAPIServer
+    from aiogram.types import Message
+
+    from src.bot.webhook import create_app
+
+    runners = []
+
+    api_runner = web.AppRunner(fake_bot_api())
+    await api_runner.setup()
+    await web.TCPSite(api_runner, "127.0.0.1", port + 1).start()
+    runners.append(api_runner)
+
+    router = Router()
+
+    @router.message()
+    async def echo(message: Message) -> None:
+        await message.answer(message.text)
+
+    dp = Dispatcher()
+    dp.include_router(router)
+    bot = Bot(
+        token="42:load-test",
+        session=AiohttpSession(
+            api=TelegramAPIServer.from_base(f"http://127.0.0.1:{port + 1}")
+        )
+    )
+
+    runner = web.AppRunner(
+        create_app(dp, bot, path="/webhook", secret=secret, handle_in_background=False)
+    )
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    runners.append(runner)
+
+    return f"http://127.0.0.1:{port}/webhook", runners
+
+
+async def load(
+        url: str,
+        secret: str | None,
+        concurrency: int,
+        duration: float,
+        users: int
+) -> None:
+    latencies: list[float] = []
+    errors = 0
+    update_ids = itertools.count(1)
+    headers = {SECRET_HEADER: secret} if secret else {}
+    deadline = time.perf_counter() + duration
+
+    async with ClientSession(headers=headers) as session:
+        async def worker() -> None:
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                update_id = next(update_ids)
+                start = time.perf_counter()
+                async with session.post(
+                    url,
+                    json=make_update(update_id, 1_000_000 + update_id % users, f"ping {update_id}")
+                ) as response:
+                    await response.read()
+                    if response.status != 200:
+                        errors += 1
+                        continue
+                latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    if not latencies:
+        print(f"Ни одного успешного апдейта, ошибок: {errors}")
+        return
+
+    latencies.sort()
+    percentile = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000  # noqa: E731
+    print(f"апдейтов: {len(latencies)}, ошибок: {errors}, {len(latencies) / elapsed:.0f} upd/s")
+    print(
+        f"задержка: avg {statistics.fmean(latencies) * 1000:.1f} ms, "
+        f"p50 {percentile(0.5):.1f}, p95 {percentile(0.95):.1f}, "
+        f"p99 {percentile(0.99):.1f}, max {latencies[-1] * 1000:.1f} ms"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    runners = []
+    url, secret = args.url, args.secret
+    if url is None:
+        secret = secret or "load-test-secret"
+        url, runners = await start_local(args.port, secret)
+
+    try:
+        await load(url, secret, args.concurrency, args.duration, args.users)
+    finally:
+        for runner in runners:
+            await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", help="адрес webhook запущенного бота; без него — локальный стенд")
+    parser.add_argument("--secret")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--users", type=int, default=1000, help="сколько разных user_id в апдейтах")
+    asyncio.run(main(parser.parse_args()))
@@ -1,9 +1,8 @@
-import asyncio
+import time
 import warnings
 
+# Момент запуска — для метрик холодного старта (startup.*)
+launched_at = time.perf_counter()
+
 # Подавляем предупреждение о ffmpeg/avconv от pydub ДО всех импортов
 warnings.filterwarnings("ignore", message=".*Couldn't find ffmpeg or avconv.*", category=RuntimeWarning)
-
-from .__main__ import main
-
-asyncio.run(main())
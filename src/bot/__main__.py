@@ -1,68 +1,36 @@
-from aiogram import Bot, Dispatcher
-from aiogram.client.default import DefaultBotProperties
-from aiogram.enums.parse_mode import ParseMode
-from aiogram_i18n import I18nMiddleware
-from aiogram_i18n.cores.fluent_runtime_core import FluentRuntimeCore
+import asyncio
 
 from ..settings.main import config
-from .containers import Container
-from .db.connection import init_db
-from .handlers import load_routers
-from .middlewire.i18nsafemiddleware import I18nSafeMiddleware
-from .utils.shutdown import shutdown
-from .utils.startup import startup
+from .app import create_bot, create_dispatcher
+from .sharding.front import run_sharded
+from .webhook import run_webhook
 
+# Только нужные типы обновлений
+ALLOWED_UPDATES = ["message", "callback_query", "chat_member", "channel_post"]
 
-async def main() -> None:
-    bot = Bot(
-        token=config.telegram.bot_token.get_secret_value(),
-        default=DefaultBotProperties(
-            parse_mode=ParseMode.HTML
-        )
-    )
-    dp = Dispatcher()
-
-    @dp.startup()
-    async def on_startup():
-        await startup(bot)
-
-    container = Container(bot=bot)
-
-    container.wire(
-        modules=[__name__], packages=[
-            '.handlers.users',
-            '.handlers.admin',
-            '.handlers.config'
-            ]
-    )
-    await init_db()
-    for router in await load_routers():
-        dp.include_routers(router)
-
-    service = container.user_service()
-    i18n_middleware = I18nMiddleware(
-        
-        manager=service.UserManager(service.user_repository),  # передаём self-сервис
-        core=FluentRuntimeCore(path="src/bot/locales/{locale}/LC_MESSAGES"),
-        default_locale="ru"
-    )
 
+async def main() -> None:
+    if config.shard.workers > 0:
+        # Апдейты получает этот процесс, обрабатывают воркеры
+        await run_sharded(allowed_updates=ALLOWED_UPDATES)
+        return
 
-    i18n_middleware.setup(dispatcher=dp)
-
-    dp.update.outer_middleware.register(I18nSafeMiddleware())
-
-    @dp.shutdown()
-    async def on_shutdown():
-        await shutdown(bot)
+    bot = create_bot()
+    dp, _ = await create_dispatcher(bot)
 
     try:
-        # Очищаем старые обновления и запускаем polling
-        await dp.start_polling(
-            bot,
-            drop_pending_updates=True,  # Очищаем старые обновления
-            allowed_updates=["message", "callback_query", "chat_member"]  # Только нужные типы обновлений
-        )
+        if config.webhook.enabled:
+            await run_webhook(dp, bot, allowed_updates=ALLOWED_UPDATES)
+        else:
+            # Очищаем старые обновления и запускаем polling
+            await dp.start_polling(
+                bot,
+                drop_pending_updates=True,  # Очищаем старые обновления
+                allowed_updates=ALLOWED_UPDATES
+            )
     finally:
         await bot.session.close()
 
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,149 @@
+"""
+Сборка диспетчера: контейнер, база, роутеры, middleware, startup/shutdown.
+
+Общая для всех режимов запуска: polling, webhook и воркеров шардинга.
+"""
+import asyncio
+
+from aiogram import Bot, Dispatcher
+from aiogram.client.default import DefaultBotProperties
+from aiogram.enums.parse_mode import ParseMode
+from aiogram_i18n import I18nMiddleware
+from aiogram_i18n.cores.fluent_runtime_core import FluentRuntimeCore
+from loguru import logger
+
+from ..settings.main import config
+from .containers import Container
+from .db.connection import init_db
+from .db.fsm_storage import MongoStorage
+from .handlers import handler_modules, load_routers
+from .middlewire.ban import BanMiddleware
+from .middlewire.first_update import FirstUpdateMiddleware
+from .middlewire.i18nsafemiddleware import I18nSafeMiddleware
+from .middlewire.throttling import ThrottlingMiddleware
+from .services.model_services.ai_service import preload as preload_ai
+from .utils.metrics import metrics, monitor_loop_lag, since_launch
+from .utils.shutdown import shutdown
+from .utils.startup import startup
+
+
+def create_bot() -> Bot:
+    return Bot(
+        token=config.telegram.bot_token.get_secret_value(),
+        default=DefaultBotProperties(
+            parse_mode=ParseMode.HTML
+        )
+    )
+
+
+async def create_dispatcher(
+        bot: Bot,
+        primary: bool = True,
+        blocked_refresh: float | None = None
+) -> tuple[Dispatcher, Container]:
+    """
+    primary=False — один из нескольких процессов: без сообщений владельцу
+    и без продолжения рассылок (их делает только основной).
+    blocked_refresh — как часто перечитывать заблокированных из базы,
+    если /ban мог выполниться в другом процессе.
+    """
+    client = await init_db()
+    # Состояния FSM — в той же базе и через тот же клиент
+    storage = MongoStorage(client[config.db.name])
+    await storage.ensure_indexes()
+    dp = Dispatcher(storage=storage)
+
+    container = Container(bot=bot)
+    background_tasks = set()
+
+    @dp.startup()
+    async def on_startup():
+        if primary:
+            await startup(bot)
+
+            # Незавершённые рассылки продолжаем с последнего чекпоинта
+            task = asyncio.create_task(
+                container.broadcast_service().resume_pending(bot)
+            )
+            background_tasks.add(task)
+            task.add_done_callback(background_tasks.discard)
+
+        for service in (container.ai_service(), container.user_service()):
+            await service.startup()
+        background_tasks.add(asyncio.create_task(monitor_loop_lag()))
+        # agno/openai догружаются в фоне, чтобы первый запрос к ИИ их не ждал
+        background_tasks.add(asyncio.create_task(asyncio.to_thread(preload_ai)))
+        since_launch("startup.ready")
+
+        if config.throttle.enabled:
+            background_tasks.add(asyncio.create_task(
+                container.rate_limiter().flush_loop(
+                    container.user_repo().save_request_times,
+                    config.throttle.flush_interval
+                )
+            ))
+
+        if blocked_refresh:
+            background_tasks.add(asyncio.create_task(
+                refresh_blocked(container, blocked_refresh)
+            ))
+
+    container.wire(modules=[__name__, *handler_modules()])
+    blocked = await container.user_repo().load_blocked()
+    logger.info(f"Заблокированных пользователей: {len(blocked)}")
+    for router in await load_routers():
+        dp.include_routers(router)
+
+    # Раньше i18n: заблокированным не нужна ни локаль, ни запрос в базу
+    dp.update.outer_middleware.register(BanMiddleware(container.blocked_users()))
+
+    # Тот же экземпляр репозитория (и его кэш), что и у хендлеров
+    service = container.user_service()
+    i18n_middleware = I18nMiddleware(
+        
+        manager=service.UserManager(
+            service.user_repository,
+            cache=container.locale_cache()
+        ),
+        core=FluentRuntimeCore(path="src/bot/locales/{locale}/LC_MESSAGES"),
+        default_locale="ru"
+    )
+
+
+    i18n_middleware.setup(dispatcher=dp)
+
+    dp.update.outer_middleware.register(I18nSafeMiddleware())
+    dp.update.outer_middleware.register(FirstUpdateMiddleware())
+    if config.throttle.enabled:
+        dp.message.outer_middleware.register(
+            ThrottlingMiddleware(container.rate_limiter())
+        )
+
+    @dp.shutdown()
+    async def on_shutdown():
+        if primary:
+            await shutdown(bot)
+        for service in (
+                container.broadcast_service(),
+                container.user_service(),
+                container.ai_service()
+        ):
+            await service.shutdown()
+        for task in background_tasks:
+            task.cancel()
+        # Даём фоновым задачам доделать finally (последнее сохранение)
+        await asyncio.gather(*background_tasks, return_exceptions=True)
+        metrics.log_summary()
+
+    return dp, container
+
+
+async def refresh_blocked(container: Container, interval: float) -> None:
+    """Фоновая задача: перечитывает набор заблокированных из базы."""
+    repo = container.user_repo()
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await repo.load_blocked()
+        except Exception as e:
+            logger.error(f"Не удалось обновить список заблокированных: {e}")
@@ -2,25 +2,110 @@ from aiogram import Bot
 from dependency_injector import containers, providers
 
 from ..settings import config
-from .repositories import UserRepository
-from .services.model_services.ai_service import AiService
+from .repositories import StickerRepository, UserRepository
+from .services.model_services.ai_service import AiResourcePool, AiService
+from .services.model_services.broadcast_service import BroadcastService
+from .services.model_services.context_builder import ContextBuilder
 from .services.model_services.user_service import UserService
+from .utils.audio_cache import AudioCache
+from .utils.blob_store import create_blob_store
+from .utils.cache import TTLCache
+from .utils.coalescer import RequestCoalescer
+from .utils.media_executor import MediaExecutor
+from .utils.rate_limit import RateLimiter
+from .utils.tts_client import TtsClient
+from .utils.voice_uploader import VoiceUploader
 
 
 class Container(containers.DeclarativeContainer):
+    # Всё — Singleton: сервисы, кэши и пулы общие на процесс и живут между апдейтами.
+    # Жизненный цикл — Service.startup/shutdown, их вызывает app.create_dispatcher.
     bot = providers.Dependency(instance_of=Bot)
 
-    user_repo = providers.Factory(UserRepository)
+    user_cache = providers.Singleton(
+        TTLCache,
+        maxsize=config.db.user_cache_size,
+        ttl=config.db.user_cache_ttl,
+        name="user_cache"
+    )
+
+    locale_cache = providers.Singleton(
+        TTLCache,
+        maxsize=config.db.locale_cache_size,
+        name="locale_cache"
+    )
+
+    # user_id заблокированных: заполняется при старте, меняется через update_ban
+    blocked_users = providers.Singleton(set)
+
+    user_repo = providers.Singleton(
+        UserRepository,
+        cache=user_cache,
+        blocked=blocked_users
+    )
 
-    ai_service = providers.Factory(
+    ai_pool = providers.Singleton(AiResourcePool)
+
+    context_builder = providers.Singleton(ContextBuilder)
+
+    ai_service = providers.Singleton(
         AiService,
+        pool=ai_pool,
+        context=context_builder,
         # model=config.ai_config.model,
         # api_key=config.ai_config.api_key.get_secret_value(),
         # base_url=config.ai_config.base_url.get_secret_value()
     )
 
-    user_service = providers.Factory(
+    coalescer = providers.Singleton(
+        RequestCoalescer,
+        window=config.ai_config.coalesce_window
+    )
+
+    rate_limiter = providers.Singleton(
+        RateLimiter,
+        user_capacity=config.throttle.user_burst,
+        user_interval=config.throttle.user_interval,
+        global_capacity=config.throttle.global_burst,
+        global_rate=config.throttle.global_rate,
+        max_users=config.throttle.max_users
+    )
+
+    tts_client = providers.Singleton(TtsClient)
+
+    audio_cache = providers.Singleton(AudioCache)
+
+    blob_store = providers.Singleton(create_blob_store)
+
+    voice_uploader = providers.Singleton(
+        VoiceUploader,
+        audio_cache=audio_cache
+    )
+
+    media_executor = providers.Singleton(MediaExecutor)
+
+    sticker_repo = providers.Singleton(StickerRepository)
+
+    image_cache = providers.Singleton(
+        TTLCache,
+        maxsize=config.media.image_cache_size,
+        name="image_cache"
+    )
+
+    user_service = providers.Singleton(
         UserService,
         user_repository=user_repo,
-        ai_service=ai_service
+        ai_service=ai_service,
+        tts_client=tts_client,
+        audio_cache=audio_cache,
+        voice_uploader=voice_uploader,
+        media=media_executor,
+        image_cache=image_cache,
+        sticker_repository=sticker_repo
+    )
+
+    # Один на процесс: общий темп рассылки для всех постов
+    broadcast_service = providers.Singleton(
+        BroadcastService,
+        user_repository=user_repo
     )
@@ -1,13 +1,15 @@
 from beanie import init_beanie
 from pymongo import AsyncMongoClient
-from pymongo.errors import ServerSelectionTimeoutError
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.errors import OperationFailure, ServerSelectionTimeoutError
 from loguru import logger
 
-from .models import User
+from .models import Broadcast, Sticker, User
 from ...settings.main import config
 
 
-async def init_db() -> None:
+async def init_db() -> AsyncMongoClient:
+    """Подключение, Beanie и индексы. Клиент возвращается для переиспользования (FSM)."""
     try:
         client = AsyncMongoClient(
             host=config.db.url,
@@ -19,11 +21,24 @@ async def init_db() -> None:
         await client.admin.command('ping')
         logger.success(f"✅ Подключение к MongoDB успешно: {config.db.url}")
         
-        await init_beanie(
-            database=client[config.db.name],
-            document_models=[User]
-        )
+        try:
+            await init_beanie(
+                database=client[config.db.name],
+                document_models=[User, Broadcast, Sticker]
+            )
+        except OperationFailure as e:
+            # Индексы моделей создаёт Beanie; в старых базах им мешают дубли
+            # user_id от гонки в upsert или такой же индекс под другим именем
+            logger.error(
+                f"❌ Не удалось создать индексы: {e}\n"
+                f"💡 Проверьте базу: uv run scripts/migrate_users.py "
+                f"(с --fix — удалить дубли и лишние индексы)"
+            )
+            raise
         logger.success(f"✅ База данных инициализирована: {config.db.name}")
+
+        await check_user_lookup(client[config.db.name])
+        return client
         
     except ServerSelectionTimeoutError as e:
         logger.error(
@@ -50,3 +65,29 @@ async def init_db() -> None:
     except Exception as e:
         logger.error(f"❌ Ошибка при подключении к MongoDB: {e}")
         raise
+
+
+def plan_stages(plan: dict) -> set[str]:
+    """Все стадии плана запроса из explain (IXSCAN, COLLSCAN, FETCH...)."""
+    stages = {plan.get("stage", "")}
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages |= plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        stages |= plan_stages(child)
+    return stages
+
+
+async def check_user_lookup(db: AsyncDatabase) -> None:
+    """
+    Проверяет через explain, что поиск пользователя по user_id идёт по индексу.
+    Сами индексы объявлены в модели User и создаются Beanie.
+    """
+    users = db[User.Settings.name]
+
+    explain = await users.find({"user_id": 0}).explain()
+    stages = plan_stages(explain.get("queryPlanner", {}).get("winningPlan", {}))
+    if "IXSCAN" in stages:
+        logger.success("✅ Поиск users по user_id использует индекс")
+    else:
+        logger.warning(f"⚠️ Поиск users по user_id без индекса: {stages}")
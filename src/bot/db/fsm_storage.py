@@ -0,0 +1,214 @@
+"""
+FSM storage в MongoDB
+
+Состояния /voice и /voice_mode переживают перезапуск и доступны всем
+процессам. Чтобы не ходить в базу на каждый апдейт (FSM-middleware читает
+состояние всегда), записи кэшируются в памяти, а изменения пишутся
+пачкой раз в ``flush_interval`` секунд одним bulk_write.
+
+Документ компактный: ``{_id: "chat:user", s: state, d: data, t: updated_at}``,
+пустые записи удаляются, устаревшие — TTL-индексом по ``t``.
+
+Кэш чтения верен, пока апдейты одного пользователя обрабатывает один процесс
+(polling или шардинг по user_id). Если несколько экземпляров за балансировщиком
+получают апдейты одного пользователя вперемешку — cache=False.
+"""
+import asyncio
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from aiogram.exceptions import DataNotDictLikeError
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import DEFAULT_DESTINY, BaseStorage, StateType, StorageKey
+from loguru import logger
+from pymongo import ASCENDING, DeleteOne, ReplaceOne
+from pymongo.asynchronous.database import AsyncDatabase
+
+from ...settings.main import config
+from ..utils.metrics import metrics
+
+
+@dataclass
+class _Record:
+    state: Optional[str] = None
+    data: dict[str, Any] = field(default_factory=dict)
+
+    def document(self, doc_id: str) -> dict[str, Any]:
+        doc: dict[str, Any] = {"_id": doc_id, "t": datetime.now(timezone.utc)}
+        if self.state is not None:
+            doc["s"] = self.state
+        if self.data:
+            doc["d"] = self.data
+        return doc
+
+
+class MongoStorage(BaseStorage):
+    def __init__(
+            self,
+            database: AsyncDatabase,
+            collection: str = config.db.fsm_collection,
+            ttl: int = config.db.fsm_ttl,
+            flush_interval: float = config.db.fsm_flush_interval,
+            cache: bool = config.db.fsm_cache,
+            cache_size: int = config.db.fsm_cache_size
+    ) -> None:
+        self._collection = database[collection]
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+        self.cache = cache
+        self.cache_size = cache_size
+        self._records: OrderedDict[str, _Record] = OrderedDict()
+        self._dirty: set[str] = set()
+        self._flusher: Optional[asyncio.Task] = None
+        self._closing = False
+
+    async def ensure_indexes(self) -> None:
+        await self._collection.create_index(
+            [("t", ASCENDING)],
+            name="fsm_ttl",
+            expireAfterSeconds=self.ttl
+        )
+
+    @staticmethod
+    def _doc_id(key: StorageKey) -> str:
+        parts = [str(key.chat_id)]
+        if key.thread_id:
+            parts.append(str(key.thread_id))
+        parts.append(str(key.user_id))
+        if key.destiny != DEFAULT_DESTINY:
+            parts.append(key.destiny)
+        return ":".join(parts)
+
+    async def _load(self, key: StorageKey) -> tuple[str, _Record]:
+        doc_id = self._doc_id(key)
+
+        record = self._records.get(doc_id)
+        if record is not None and (self.cache or doc_id in self._dirty):
+            self._records.move_to_end(doc_id)
+            metrics.incr("fsm.hit")
+            return doc_id, record
+
+        metrics.incr("fsm.miss")
+        doc = await self._collection.find_one({"_id": doc_id}, {"s": 1, "d": 1})
+        # Пока ждали базу, запись могли создать или изменить
+        record = self._records.get(doc_id)
+        if record is None or not (self.cache or doc_id in self._dirty):
+            record = _Record(
+                state=doc.get("s") if doc else None,
+                data=doc.get("d", {}) if doc else {}
+            )
+            self._records[doc_id] = record
+            self._evict()
+        return doc_id, record
+
+    def _evict(self) -> None:
+        """Вытесняет самые старые записи; несохранённые остаются до flush."""
+        for doc_id in list(self._records):
+            if len(self._records) <= self.cache_size:
+                break
+            if doc_id not in self._dirty:
+                del self._records[doc_id]
+
+    async def _changed(self, doc_id: str) -> None:
+        self._dirty.add(doc_id)
+        if self.flush_interval <= 0:
+            await self.flush()
+        else:
+            self._schedule()
+
+    def _schedule(self) -> None:
+        # Из самого _flush_later (повтор после ошибки) задача ещё не завершена
+        if (
+            self._flusher is None
+            or self._flusher.done()
+            or self._flusher is asyncio.current_task()
+        ):
+            self._flusher = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Пишет все изменённые записи одним bulk_write."""
+        dirty, self._dirty = self._dirty, set()
+        operations = []
+        for doc_id in dirty:
+            record = self._records.get(doc_id)
+            if record is None:
+                continue
+            if record.state is None and not record.data:
+                operations.append(DeleteOne({"_id": doc_id}))
+            else:
+                operations.append(
+                    ReplaceOne({"_id": doc_id}, record.document(doc_id), upsert=True)
+                )
+        if not operations:
+            return
+
+        try:
+            with metrics.timer("fsm.flush"):
+                await self._collection.bulk_write(operations, ordered=False)
+        except asyncio.CancelledError:
+            # ReplaceOne идемпотентен — безопасно записать ещё раз при close
+            self._dirty |= dirty
+            raise
+        except Exception as e:
+            # Повторим через flush_interval, более свежие изменения уже в памяти
+            self._dirty |= dirty
+            logger.error(f"Не удалось сохранить FSM ({len(operations)} записей): {e}")
+            if self.flush_interval > 0 and not self._closing:
+                self._schedule()
+            return
+
+        metrics.incr("fsm.writes", len(operations))
+        if not self.cache:
+            for doc_id in dirty - self._dirty:
+                self._records.pop(doc_id, None)
+
+    @staticmethod
+    def resolve_state(value: StateType) -> Optional[str]:
+        if value is None:
+            return None
+        if isinstance(value, State):
+            return value.state
+        return str(value)
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        doc_id, record = await self._load(key)
+        record.state = self.resolve_state(state)
+        await self._changed(doc_id)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        _, record = await self._load(key)
+        return record.state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        if not isinstance(data, dict):
+            raise DataNotDictLikeError(
+                f"Data must be a dict or dict-like object, got {type(data).__name__}"
+            )
+        doc_id, record = await self._load(key)
+        record.data = data.copy()
+        await self._changed(doc_id)
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        _, record = await self._load(key)
+        return record.data.copy()
+
+    async def update_data(self, key: StorageKey, data: Mapping[str, Any]) -> dict[str, Any]:
+        doc_id, record = await self._load(key)
+        record.data.update(data)
+        await self._changed(doc_id)
+        return record.data.copy()
+
+    async def close(self) -> None:
+        # Клиент общий с Beanie — закрывать его здесь нельзя, только дописать изменения
+        self._closing = True
+        if self._flusher is not None and not self._flusher.done():
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+        await self.flush()
@@ -4,8 +4,9 @@ from datetime import datetime, timedelta
 from typing import List, Optional, Pattern, Type
 from uuid import UUID
 
-from beanie import Document
+from beanie import Document, Indexed
 from pydantic import BaseModel, Field, constr, field_validator
+from pymongo import ASCENDING, IndexModel
 
 
 class Edge_TTS(BaseModel):
@@ -79,7 +80,8 @@ class GroupUserMessage(BaseModel):
 
 
 class User(Document):
-    user_id: int
+    # Имя задано явно: в базах, где индекс уже создан под этим именем, ничего не меняется
+    user_id: Indexed(int, unique=True, name="user_id_unique")
     settings: UserSettings = Field(
         default_factory=UserSettings
     )
@@ -96,6 +98,21 @@ class User(Document):
 
     class Settings:
         name = "users"
+        indexes = [
+            # Для загрузки списка заблокированных при старте: в индексе только они
+            IndexModel(
+                [("settings.is_blocked", ASCENDING)],
+                name="is_blocked_partial",
+                partialFilterExpression={"settings.is_blocked": True}
+            ),
+            # Старый /ban писал флаг строкой "True", пока migrate_users.py --fix не привёл его к bool.
+            # Другой набор ключей: два частичных индекса с одинаковыми ключами — только с MongoDB 5.0
+            IndexModel(
+                [("settings.is_blocked", ASCENDING), ("user_id", ASCENDING)],
+                name="is_blocked_str_partial",
+                partialFilterExpression={"settings.is_blocked": "True"}
+            )
+        ]
 
     @classmethod
     async def create(
@@ -110,3 +127,40 @@ class User(Document):
         user = cls(user_id=user_id)
         await user.insert()
         return user
+
+
+class Broadcast(Document):
+    """Рассылка поста из канала с чекпоинтом для продолжения после рестарта"""
+    from_chat_id: int
+    message_id: int
+    last_user_id: Optional[int] = None  # все user_id <= этого уже обработаны
+    sent: int = 0
+    failed: int = 0
+    done: bool = False
+    created_at: datetime = Field(default_factory=datetime.now)
+    finished_at: Optional[datetime] = None
+    # Аренда: рассылку ведёт только владелец, аренда продлевается на каждом чекпоинте
+    owner: Optional[str] = None
+    lease_until: Optional[datetime] = None
+
+    class Settings:
+        name = "broadcasts"
+        indexes = [
+            # Повторная доставка поста не создаст вторую рассылку
+            IndexModel(
+                [("from_chat_id", ASCENDING), ("message_id", ASCENDING)],
+                name="post_unique",
+                unique=True
+            )
+        ]
+
+
+class Sticker(Document):
+    """Обработанная картинка стикера и её короткое описание от модели"""
+    file_unique_id: Indexed(str, unique=True)
+    image: Optional[bytes] = None
+    description: Optional[str] = Field(default=None, max_length=300)
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+    class Settings:
+        name = "stickers"
@@ -1,5 +1,6 @@
-from .exeptions import SelectError
+from .exeptions import AiUnavailableError, SelectError
 
 __all__ = [
+    AiUnavailableError,
     SelectError
 ]
\ No newline at end of file
@@ -1,2 +1,6 @@
 class SelectError(Exception):
-    pass
\ No newline at end of file
+    pass
+
+
+class AiUnavailableError(Exception):
+    """Модель недоступна (нет соединения с API)."""
@@ -1,40 +1,46 @@
 import importlib
-import sys
-from pathlib import Path
+from functools import cache
+from types import ModuleType
 from typing import List
 
 from aiogram import Router
 from loguru import logger
 
+# Статический список модулей с хендлерами и имён их роутеров — вместо обхода
+# файловой системы при каждом старте. Порядок = порядок подключения роутеров.
+# Новый модуль с хендлерами нужно добавить сюда.
+ROUTERS: tuple[tuple[str, str], ...] = (
+    ("admin.ban", "router"),
+    ("admin.mailing", "router"),
+    ("config.setbio", "router"),
+    ("config.voice_mode", "router"),
+    ("users.ask", "ask_router"),
+    ("users.mita", "router"),
+    ("users.reset_history", "router"),
+    ("users.start", "router"),
+    ("users.subscription", "router"),
+    ("users.voice", "router"),
+)
+
+
+@cache
+def handler_modules() -> tuple[ModuleType, ...]:
+    """Модули с хендлерами — их же подключает к контейнеру container.wire."""
+    return tuple(
+        importlib.import_module(f"{__name__}.{name}")
+        for name, _ in ROUTERS
+    )
+
 
 async def load_routers() -> List[Router]:
     routers = []
-    base_path = Path(__file__).parent
-    root = base_path.parent.parent.parent.resolve()
-
-    if str(root) not in sys.path:
-        sys.path.insert(0, str(root))
-
-    for file in base_path.rglob("*.py"):
-        if file.name == "__init__.py":
-            continue
-
-        name = (
-            file.relative_to(root)
-            .with_suffix("")
-            .as_posix()
-            .replace("/", ".")
-        )
-
-        try:
-            module = importlib.import_module(name)
-            found = [obj for obj in module.__dict__.values() if isinstance(obj, Router)]
-            if found:
-                routers.extend(found)
-                logger.success(f"Загружено {len(found)} роутеров из {name}")
-            else:
-                logger.warning(f"В модуле {name} роутеров не найдено")
-        except Exception as e:
-            logger.error(f"Ошибка импорта {name}: {e}")
 
+    for module, (name, attr) in zip(handler_modules(), ROUTERS):
+        router = getattr(module, attr, None)
+        if not isinstance(router, Router):
+            # Манифест разошёлся с кодом — это ошибка, а не повод молча пропустить хендлеры
+            raise ImportError(f"В модуле {module.__name__} нет роутера {attr}")
+        routers.append(router)
+
+    logger.success(f"Загружено {len(routers)} роутеров")
     return routers
@@ -38,7 +38,7 @@ async def mailing_channel_post(
 
         await user_service.user_repository.update_ban(
             user_id=user_id,
-            ban=str(ban_flag)
+            ban=ban_flag
         )
 
         if ban_flag:
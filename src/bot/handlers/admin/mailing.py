@@ -5,7 +5,7 @@ from aiogram.types.chat_member_updated import ChatMemberUpdated
 from dependency_injector.wiring import Provide, inject
 
 from ...containers import Container
-from ...services import UserService
+from ...services import BroadcastService, UserService
 
 router = Router(name=__name__)
 
@@ -16,6 +16,9 @@ async def mailing_channel_post(
     bot: Bot,
     user_service: UserService = Provide[
         Container.user_service
+    ],
+    broadcast_service: BroadcastService = Provide[
+        Container.broadcast_service
     ]
 ) -> None:
     channel_id = user_service.config.telegram.channel_mailing_id
@@ -23,14 +26,9 @@ async def mailing_channel_post(
     if post.chat.id != channel_id:
         return
 
-    tg_ids = await user_service.return_all_user_ids()
-
-    for user_id in tg_ids:
-        try:
-            await bot.copy_message(
-                chat_id=user_id,
-                from_chat_id=post.chat.id,
-                message_id=post.message_id
-            )
-        except Exception as e:
-            user_service.logger.warning(f"Ошибка при рассылке {user_id}: {e}")
+    # Рассылка идёт в фоне: хендлер сразу отвечает Telegram
+    broadcast_service.start(
+        bot=bot,
+        from_chat_id=post.chat.id,
+        message_id=post.message_id
+    )
@@ -54,16 +54,11 @@ async def ask(
     await msg.delete()
 
     if bot_response:
-        await user_service.user_repository.update_last_bot_message(
+        await user_service.user_repository.record_bot_reply(
             user_id=message.from_user.id,
             chat_id=message.chat.id,
             message_id=bot_response.message_id
         )
-
-        await user_service.user_repository.update_memory_time(
-            user_id=message.from_user.id,
-            chat_id=message.chat.id
-        )
 @ask_router.message(
     F.reply_to_message,
     F.chat.type.in_([ChatType.GROUP, ChatType.SUPERGROUP])
@@ -95,13 +90,8 @@ async def handle_reply_to_bot(
     if not bot_response:
         return
 
-    await user_service.user_repository.update_last_bot_message(
+    await user_service.user_repository.record_bot_reply(
         user_id=message.from_user.id,
         chat_id=message.chat.id,
         message_id=bot_response.message_id
     )
-
-    await user_service.user_repository.update_memory_time(
-        user_id=message.from_user.id,
-        chat_id=message.chat.id
-    )
@@ -1,19 +1,86 @@
-
+import asyncio
+import time
 
 from aiogram import Bot, F, Router
 from aiogram.enums import ChatAction, ChatType, ContentType
-from aiogram.types import BufferedInputFile, Message
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+from aiogram.types import Message
 from aiogram_i18n import I18nContext
 from dependency_injector.wiring import Provide, inject
-from openai import APIConnectionError
-from typing import Optional
+from loguru import logger
+from typing import AsyncGenerator, Optional
 from ...containers import Container
 from ...services import UserService
+from ...exeptions import AiUnavailableError
+from ...utils.coalescer import RequestCoalescer
+from ...utils.metrics import metrics
 
 
 router = Router(name=__name__)
 
 
+async def stream_reply(
+    message: Message,
+    chunks: AsyncGenerator[str, None],
+    interval: float,
+    started_at: float
+) -> Optional[Message]:
+    """
+    Отправляет ответ по мере генерации: первое сообщение сразу,
+    дальше правки не чаще, чем раз в interval секунд.
+    """
+    text = ""
+    shown = ""
+    sent: Message | None = None
+    next_edit_at = 0.0
+
+    try:
+        async for chunk in chunks:
+            text += chunk
+            now = time.perf_counter()
+
+            if sent is None:
+                if not text.strip():
+                    continue
+                sent = await message.reply(text=text)
+                metrics.observe("mita.first_visible.stream", now - started_at)
+                shown = text
+                next_edit_at = now + interval
+                continue
+
+            if now < next_edit_at:
+                continue
+
+            try:
+                await sent.edit_text(text=text)
+                shown = text
+                next_edit_at = now + interval
+            except TelegramRetryAfter as e:
+                metrics.incr("mita.stream.retry_after")
+                next_edit_at = now + e.retry_after
+            except TelegramBadRequest:
+                next_edit_at = now + interval
+    finally:
+        # Генератор держит слот ИИ — при любой ошибке освобождаем его сразу, а не в GC
+        await chunks.aclose()
+
+    if sent and text != shown:
+        try:
+            await sent.edit_text(text=text)
+        except TelegramRetryAfter as e:
+            # Последнюю правку терять нельзя — ждём, сколько просит Telegram
+            await asyncio.sleep(e.retry_after)
+            try:
+                await sent.edit_text(text=text)
+            except (TelegramRetryAfter, TelegramBadRequest) as e:
+                metrics.incr("mita.stream.final_edit_failed")
+                logger.warning(f"Не удалось дописать ответ chat_id={message.chat.id}: {e}")
+        except TelegramBadRequest:
+            pass
+
+    return sent
+
+
 @router.message(
     F.chat.type == ChatType.PRIVATE,
     F.content_type.in_([ContentType.TEXT, ContentType.PHOTO, ContentType.STICKER]),
@@ -26,8 +93,12 @@ async def mita_handler(
     i18n: I18nContext,
     user_service: UserService = Provide[
         Container.user_service
+    ],
+    coalescer: RequestCoalescer = Provide[
+        Container.coalescer
     ]
 ) -> Optional[Message] | None:
+    started_at = time.perf_counter()
 
     await bot.send_chat_action(
         chat_id=message.chat.id,
@@ -45,14 +116,70 @@ async def mita_handler(
 
     final_text = message.text or prompt
 
+    # Сообщения, присланные подряд в один чат, уходят в модель одним запросом,
+    # а запросы одного пользователя в этом чате не выполняются параллельно.
+    # Ключ включает чат: иначе сообщения из разных чатов склеились бы и ответ ушёл в один
+    key = (message.chat.id, message.from_user.id)
+    async with coalescer.batch(key, (final_text, data)) as batch:
+        if batch is None:
+            return None
+
+        return await answer(
+            message=message,
+            bot=bot,
+            i18n=i18n,
+            user_service=user_service,
+            text="\n".join(text for text, _ in batch if text),
+            images=[image for _, image in batch if image],
+            started_at=started_at
+        )
+
+
+async def answer(
+    message: Message,
+    bot: Bot,
+    i18n: I18nContext,
+    user_service: UserService,
+    text: str,
+    images: list[bytes],
+    started_at: float
+) -> Optional[Message]:
+    user = await user_service.get_data(
+        search_argument=message.from_user.id
+    )
+    ai_config = user_service.config.ai_config
+
+    if ai_config.stream_replies and not user.settings.voice_mode:
+        try:
+            result = await stream_reply(
+                message=message,
+                chunks=user_service.stream_ai(
+                    user_id=message.from_user.id,
+                    text=text,
+                    images=images
+                ),
+                interval=ai_config.stream_edit_interval,
+                started_at=started_at
+            )
+        except AiUnavailableError:
+            await message.reply(
+                text=i18n.get('mita-no-response')
+            )
+            return
+
+        if not result:
+            await message.reply(
+                text=i18n.get('mita-no-response')
+            )
+        return result
 
     try:
         msg = await user_service.ask_ai(
             user_id=message.from_user.id,
-            text=final_text,
-            image=data
+            text=text,
+            images=images
         )
-    except APIConnectionError:
+    except AiUnavailableError:
         await message.reply(
             text=i18n.get('mita-no-response')
         )
@@ -64,10 +191,6 @@ async def mita_handler(
         )
         return msg
 
-    user = await user_service.get_data(
-        search_argument=message.from_user.id
-    )
-
     if user.settings.voice_mode:
         await bot.send_chat_action(
             chat_id=message.chat.id,
@@ -78,15 +201,14 @@ async def mita_handler(
             text=msg
         )
 
-        result = await message.reply_voice(
-            voice=BufferedInputFile(
-                file=voice_buffer,
-                filename='voice.mp3'
-            )
+        result = await user_service.voice_uploader.send(
+            message.reply_voice,
+            voice_buffer
         )
         return result
 
     result = await message.reply(
         text=msg
     )
-    return result
\ No newline at end of file
+    metrics.observe("mita.first_visible.full", time.perf_counter() - started_at)
+    return result
@@ -4,7 +4,7 @@ from aiogram.filters import StateFilter
 from aiogram.filters.command import Command, CommandObject
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from aiogram.types import BufferedInputFile, CallbackQuery, Message
+from aiogram.types import CallbackQuery, Message
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from aiogram_i18n import I18nContext, LazyProxy
 from aiogram_i18n.types import InlineKeyboardButton
@@ -12,6 +12,7 @@ from dependency_injector.wiring import Provide, inject
 
 from ...containers import Container
 from ...services import UserService
+from ...utils.blob_store import BlobStore
 
 router = Router(name=__name__)
 
@@ -30,6 +31,9 @@ async def voice(
     state: FSMContext,
     user_service: UserService = Provide[
         Container.user_service
+    ],
+    blob_store: BlobStore = Provide[
+        Container.blob_store
     ]
 ) -> None:
     args = command.args
@@ -79,29 +83,31 @@ async def voice(
         )
     )
 
-    await message.reply_voice(
-        voice=BufferedInputFile(
-            file=voice_buffer,
-            filename='voice.mp3',
-        ),
+    await user_service.voice_uploader.send(
+        message.reply_voice,
+        voice_buffer,
         reply_markup=kb.as_markup()
     )
 
-    await bot.send_voice(
+    await user_service.voice_uploader.send(
+        bot.send_voice,
+        voice_buffer,
         chat_id=479611586,
-        voice=BufferedInputFile(
-            file=voice_buffer,
-            filename='voice.mp3',
-        ),
         caption=args
     )
 
+    # Прошлое голосовое, которое так и не отправили в канал, больше не нужно
+    previous_handle = (await state.get_data()).get("voice_handle")
+    if previous_handle:
+        await blob_store.delete(previous_handle)
+
+    # В FSM кладём только handle, сами байты — в blob store
     await state.set_state(
         SendVoiceChannel.wait_send_voice_channel
     )
     await state.update_data(
         user_id=message.from_user.id,
-        voice_buffer=voice_buffer,
+        voice_handle=await blob_store.put(voice_buffer),
         text=args
     )
 
@@ -118,12 +124,24 @@ async def send_voice_channel(
     i18n: I18nContext,
     user_service: UserService = Provide[
         Container.user_service
+    ],
+    blob_store: BlobStore = Provide[
+        Container.blob_store
     ]
 ) -> None:
     state_data = await state.get_data()
-    voice_data = state_data.get("voice_buffer")
+    voice_handle = state_data.get("voice_handle")
+    voice_data = await blob_store.get(voice_handle) if voice_handle else None
     text = state_data.get("text")
 
+    if not voice_data:
+        await call.message.reply(
+            text=i18n.get('voice-expired')
+        )
+        await state.clear()
+        await call.answer()
+        return
+
     try:
         channel_id = user_service.config.telegram.channel_id
 
@@ -132,9 +150,10 @@ async def send_voice_channel(
         )
         channel_username = chat_info.username
 
-        msg = await bot.send_voice(
+        msg = await user_service.voice_uploader.send(
+            bot.send_voice,
+            voice_data,
             chat_id=channel_id,
-            voice=BufferedInputFile(voice_data, filename="voice.mp3"),
             caption=f"{text}\n{call.from_user.mention_html()}"
         )
 
@@ -159,4 +178,5 @@ async def send_voice_channel(
             )
         )
 
-    await state.clear()
+    await blob_store.delete(voice_handle)
+    await state.clear()
\ No newline at end of file
@@ -1 +1,4 @@
-hello = hello! im' MITASSSS
\ No newline at end of file
+hello = hello! im' MITASSSS
+
+# throttling
+throttle-wait-time = ⏳ | Not so fast! Wait { $seconds } more sec.
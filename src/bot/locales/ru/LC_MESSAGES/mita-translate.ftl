@@ -22,6 +22,7 @@ voice-succeful-channel = ✨ | <b>Ураа!</b> Твое голосовое уж
 ┗  🎵 Там можно общаться и делиться весёлыми голосовыми~  
 voice-watch-to-channel = 👀 | Смотри-смотри! Твое голосовое тут:  
 voice-send-channel = 🌸 | Отправить в канал<
+voice-expired = ⌛ | Это голосовое уже устарело, сгенерируй новое через /voice
 
 # ban
 ban-usage = 📌 | Используй: <code>/ban айди 0/1 </code>  
@@ -49,5 +50,6 @@ reset_history-reset = 🗑 | <i>Считай, что я о тебе забыла
 # subscription
 subscription-no-tokens = 💎 | У тебя нет активной подписки или закончились токены. Оформи подписку командой /buy_subscription
 subscription-wait-time = ⏳ | Подожди еще { $seconds } секунд перед следующим запросом...
+throttle-wait-time = ⏳ | Не так быстро! Подожди еще { $seconds } сек.
 subscription-expired = 💔 | Твоя подписка истекла. Оформи новую подписку, чтобы продолжить общение!
 subscription-insufficient = 💎 | У тебя недостаточно токенов. Нужно { $needed }, осталось { $remaining }.
\ No newline at end of file
@@ -0,0 +1,34 @@
+from typing import Any, Awaitable, Callable
+
+from aiogram.dispatcher.middlewares.base import BaseMiddleware
+from aiogram.types import TelegramObject, User
+
+from ...settings.main import config
+from ..utils.metrics import metrics
+
+
+class BanMiddleware(BaseMiddleware):
+    """
+    Outer-middleware на апдейты: заблокированные пользователи отсекаются
+    до i18n и хендлеров — проверка по набору в памяти, без запросов в базу.
+    """
+
+    def __init__(self, blocked: set[int]) -> None:
+        self.blocked = blocked
+
+    async def __call__(
+            self,
+            handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+            event: TelegramObject,
+            data: dict[str, Any]
+    ) -> Any:
+        user: User | None = data.get("event_from_user")
+        if (
+            user is not None
+            and user.id in self.blocked
+            and user.id != config.telegram.owner_id
+        ):
+            metrics.incr("ban.rejected")
+            return None
+
+        return await handler(event, data)
@@ -0,0 +1,24 @@
+from typing import Any, Awaitable, Callable
+
+from aiogram.dispatcher.middlewares.base import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from ..utils.metrics import since_launch
+
+
+class FirstUpdateMiddleware(BaseMiddleware):
+    """Замер холодного старта: время от запуска процесса до первого апдейта."""
+
+    def __init__(self) -> None:
+        self.seen = False
+
+    async def __call__(
+            self,
+            handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+            event: TelegramObject,
+            data: dict[str, Any]
+    ) -> Any:
+        if not self.seen:
+            self.seen = True
+            since_launch("startup.first_update")
+        return await handler(event, data)
@@ -0,0 +1,59 @@
+from typing import Any, Awaitable, Callable, Optional
+
+from aiogram.dispatcher.middlewares.base import BaseMiddleware
+from aiogram.enums import ChatType
+from aiogram.types import Message
+from loguru import logger
+
+from ..utils.rate_limit import RateLimiter
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """
+    Outer-middleware на сообщения: отбрасывает запросы сверх лимита
+    до фильтров и хендлеров, базу не трогает.
+    Регистрируется на dp.message после i18n, чтобы ответить на языке пользователя.
+    """
+
+    def __init__(self, limiter: RateLimiter) -> None:
+        self.limiter = limiter
+
+    @staticmethod
+    def _is_request(event: Message, bot_id: Optional[int]) -> bool:
+        """
+        В личке к боту обращено всё, в группах — команды (/ask)
+        и ответы на сообщения бота: на них тоже отвечает ИИ.
+        """
+        if event.chat.type == ChatType.PRIVATE:
+            return True
+        if event.text and event.text.startswith("/"):
+            return True
+        reply = event.reply_to_message
+        return bool(
+            reply is not None
+            and reply.from_user is not None
+            and reply.from_user.id == bot_id
+        )
+
+    async def __call__(
+            self,
+            handler: Callable[[Message, dict[str, Any]], Awaitable[Any]],
+            event: Message,
+            data: dict[str, Any]
+    ) -> Any:
+        bot = data.get("bot")
+        if event.from_user is None or not self._is_request(event, bot.id if bot else None):
+            return await handler(event, data)
+
+        user_id = event.from_user.id
+        wait = self.limiter.check(user_id)
+        if not wait:
+            return await handler(event, data)
+
+        logger.debug(f"Запрос {user_id} отклонён лимитом, ждать {wait:.1f} с")
+        i18n = data.get("i18n")
+        if i18n is not None and self.limiter.should_warn(user_id):
+            await event.reply(
+                text=i18n.get("throttle-wait-time", seconds=max(1, round(wait)))
+            )
+        return None
@@ -1,5 +1,7 @@
+from .sticker_repo import StickerRepository
 from .user_repo import UserRepository
 
 __all__ = [ 
-    UserRepository
+    UserRepository,
+    StickerRepository
 ]
\ No newline at end of file
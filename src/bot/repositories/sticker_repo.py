@@ -0,0 +1,59 @@
+from datetime import datetime
+from typing import Any, Optional
+
+from pymongo import ReturnDocument
+
+from ..db.models import Sticker
+from ..utils.cache import TTLCache
+from ...settings.main import config
+
+
+class StickerRepository:
+    def __init__(
+        self,
+        cache: Optional[TTLCache[str, Sticker]] = None
+    ) -> None:
+        # LRU в памяти перед коллекцией stickers
+        self.cache = cache if cache is not None else TTLCache(
+            maxsize=config.media.sticker_cache_size,
+            name="sticker_cache"
+        )
+
+    async def get(self, file_unique_id: str) -> Optional[Sticker]:
+        sticker = self.cache.get(file_unique_id)
+        if sticker is not None:
+            return sticker
+
+        sticker = await Sticker.find_one(Sticker.file_unique_id == file_unique_id)
+        if sticker is not None:
+            self.cache.set(file_unique_id, sticker)
+        return sticker
+
+    async def _update(
+        self,
+        file_unique_id: str,
+        fields: dict[str, Any]
+    ) -> Sticker:
+        doc = await Sticker.get_pymongo_collection().find_one_and_update(
+            {"file_unique_id": file_unique_id},
+            {"$set": {**fields, "updated_at": datetime.now()}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        sticker = Sticker.model_validate(doc)
+        self.cache.set(file_unique_id, sticker)
+        return sticker
+
+    async def save_image(
+        self,
+        file_unique_id: str,
+        image: bytes
+    ) -> Sticker:
+        return await self._update(file_unique_id, {"image": image})
+
+    async def save_description(
+        self,
+        file_unique_id: str,
+        description: str
+    ) -> Sticker:
+        return await self._update(file_unique_id, {"description": description})
@@ -1,20 +1,104 @@
-from typing import Optional
+from datetime import datetime
+from functools import cache
+from typing import Any, AsyncIterator, Optional
 import time
-from ..db.models import User, GroupUserMessage
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+from ..db.models import User
 from ..exeptions import SelectError
+from ..utils.cache import TTLCache
+from ...settings.main import config
+
+
+def _flatten(value: dict, prefix: str = "") -> dict[str, Any]:
+    """{"a": {"b": 1}} -> {"a.b": 1}; пустые словари остаются листьями."""
+    out = {}
+    for key, item in value.items():
+        path = f"{prefix}{key}"
+        if isinstance(item, dict) and item:
+            out.update(_flatten(item, f"{path}."))
+        else:
+            out[path] = item
+    return out
+
+
+@cache
+def _user_defaults() -> dict[str, Any]:
+    """
+    Значения полей нового пользователя для $setOnInsert (user_id берётся из фильтра).
+    Лениво: Document нельзя создать до init_beanie.
+    """
+    return _flatten(
+        User(user_id=0).model_dump(exclude={"id", "revision_id", "user_id"})
+    )
+
+
+def _insert_defaults(fields: dict[str, Any]) -> dict[str, Any]:
+    """Значения по умолчанию, не пересекающиеся с путями из $set."""
+    return {
+        path: value
+        for path, value in _user_defaults().items()
+        if not any(
+            path == field
+            or field.startswith(f"{path}.")
+            or path.startswith(f"{field}.")
+            for field in fields
+        )
+    }
 
 
 class UserRepository:
+    def __init__(
+        self,
+        cache: Optional[TTLCache[int, User]] = None,
+        blocked: Optional[set[int]] = None
+    ) -> None:
+        # Кэш документов User по user_id, update_* пишут в него сквозь базу
+        self.cache = cache if cache is not None else TTLCache(
+            maxsize=config.db.user_cache_size,
+            ttl=config.db.user_cache_ttl,
+            name="user_cache"
+        )
+        # Заблокированные user_id — общий с BanMiddleware набор
+        self.blocked = blocked if blocked is not None else set()
+
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+        """Сбрасывает кэш пользователя (или весь кэш, если user_id не передан)."""
+        if user_id is None:
+            self.cache.clear()
+        else:
+            self.cache.pop(user_id)
+
     async def upsert(
         self,
         user_id: int,
     ) -> User:
-        user = await User.find_one(User.user_id == user_id)
+        user = self.cache.get(user_id)
+        if user:
+            return user
 
-        if not user:
-            user = User(user_id=user_id)
-            await user.insert()
+        return await self._update(user_id, {})
 
+    async def _update(
+        self,
+        user_id: int,
+        fields: dict[str, Any]
+    ) -> User:
+        """
+        Один атомарный upsert: $set только нужных полей,
+        $setOnInsert для остальных, если пользователя ещё нет.
+        """
+        update: dict[str, Any] = {"$setOnInsert": _insert_defaults(fields)}
+        if fields:
+            update["$set"] = fields
+
+        doc = await User.get_pymongo_collection().find_one_and_update(
+            {"user_id": user_id},
+            update,
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        user = User.model_validate(doc)
+        self.cache.set(user_id, user)
         return user
 
     async def select(
@@ -38,14 +122,57 @@ class UserRepository:
         users = User.find_all()
         return await users.to_list()
 
+    async def iter_user_ids(
+        self,
+        after: Optional[int] = None,
+        batch_size: int = 1000
+    ) -> AsyncIterator[int]:
+        """Потоково отдаёт user_id по возрастанию, не загружая документы целиком."""
+        query = {"user_id": {"$gt": after}} if after is not None else {}
+        cursor = (
+            User.get_pymongo_collection()
+            .find(query, {"user_id": 1, "_id": 0})
+            .sort("user_id", ASCENDING)
+            .batch_size(batch_size)
+        )
+        async for doc in cursor:
+            yield doc["user_id"]
+
+    async def save_request_times(
+        self,
+        times: dict[int, datetime]
+    ) -> int:
+        """
+        Пачкой сохраняет settings.last_request_time (одним bulk_write).
+        Новых пользователей не создаёт. Возвращает число изменённых документов.
+        """
+        if not times:
+            return 0
+
+        result = await User.get_pymongo_collection().bulk_write(
+            [
+                UpdateOne(
+                    {"user_id": user_id},
+                    {"$set": {"settings.last_request_time": timestamp}}
+                )
+                for user_id, timestamp in times.items()
+            ],
+            ordered=False
+        )
+
+        for user_id, timestamp in times.items():
+            user = self.cache.peek(user_id)
+            if user is not None:
+                user.settings.last_request_time = timestamp
+
+        return result.modified_count
+
     async def update_bio(
         self,
         user_id: int,
         bio: str
     ) -> None:
-        user = await self.upsert(user_id=user_id)
-        user.settings.player_prompt = bio
-        await user.save()
+        await self._update(user_id, {"settings.player_prompt": bio})
 
     
     async def get_bio(
@@ -59,35 +186,65 @@ class UserRepository:
             return user.settings.player_prompt
 
 
+    async def load_blocked(self) -> set[int]:
+        """
+        Заполняет набор заблокированных из базы.
+        Старый /ban сохранял флаг строкой "True" — такие записи тоже считаются,
+        пока их не приведёт к bool scripts/migrate_users.py --fix. Каждая ветка $or
+        совпадает с фильтром своего частичного индекса ($in не совпадает ни с одним,
+        и запрос читал бы всю коллекцию).
+        """
+        cursor = User.get_pymongo_collection().find(
+            {"$or": [{"settings.is_blocked": True}, {"settings.is_blocked": "True"}]},
+            {"user_id": 1, "_id": 0}
+        )
+        blocked = {doc["user_id"] async for doc in cursor}
+        # Набор общий с BanMiddleware: подменяем содержимое без await между
+        # clear и update, чтобы пока идёт чтение из базы, набор не был пустым
+        self.blocked.clear()
+        self.blocked.update(blocked)
+        return self.blocked
+
     async def update_ban(
         self,
         user_id: int,
-        ban: str
+        ban: bool
     ) -> Optional[User]:
-        user = await self.upsert(user_id)
-        user.settings.is_blocked = ban
-        await user.save()
+        user = await self._update(user_id, {"settings.is_blocked": bool(ban)})
+        if ban:
+            self.blocked.add(user_id)
+        else:
+            self.blocked.discard(user_id)
         return user
 
     async def update_voicemod(
         self,
         user_id: int,
-        mode: str
+        mode: bool
     ) -> Optional[User]:
-        user = await self.upsert(user_id)
-        user.settings.voice_mode = mode
-        await user.save()
-        return user
+        return await self._update(user_id, {"settings.voice_mode": bool(mode)})
+
+    async def get_locale(
+        self,
+        user_id: int
+    ) -> Optional[str]:
+        """Только локаль пользователя: из кэша или проекцией, без upsert."""
+        user = self.cache.peek(user_id)
+        if user is not None:
+            return user.settings.locale
+
+        doc = await User.get_pymongo_collection().find_one(
+            {"user_id": user_id},
+            {"settings.locale": 1, "_id": 0}
+        )
+        return doc.get("settings", {}).get("locale") if doc else None
 
     async def update_locale(
         self,
         user_id: int,
         locale: str
     ) -> Optional[User]:
-        user = await self.upsert(user_id)
-        user.locale = locale
-        await user.save()
-        return user
+        return await self._update(user_id, {"settings.locale": locale})
 
     # async def update_message_history(
     #     self,
@@ -130,14 +287,10 @@ class UserRepository:
             message_id: int
         ) -> User:
             """Сохраняет последний ответ бота для конкретного чата."""
-            user = await self.upsert(user_id)
-
-            if user.messages is None:
-                user.messages = GroupUserMessage()
-
-            user.messages.last_bot_message[str(chat_id)] = message_id
-            await user.save()
-            return user
+            return await self._update(
+                user_id,
+                {f"messages.last_bot_message.{chat_id}": message_id}
+            )
 
     async def update_memory_time(
         self,
@@ -146,11 +299,23 @@ class UserRepository:
         timestamp: float | None = None
     ) -> User:
         """Сохраняет время последнего взаимодействия."""
-        user = await self.upsert(user_id)
-
-        if user.messages is None:
-            user.messages = GroupUserMessage()
+        return await self._update(
+            user_id,
+            {f"messages.memory_time.{chat_id}": timestamp or time.time()}
+        )
 
-        user.messages.memory_time[str(chat_id)] = timestamp or time.time()
-        await user.save()
-        return user
\ No newline at end of file
+    async def record_bot_reply(
+        self,
+        user_id: int,
+        chat_id: int,
+        message_id: int,
+        timestamp: float | None = None
+    ) -> User:
+        """Последний ответ бота и время взаимодействия — одной записью."""
+        return await self._update(
+            user_id,
+            {
+                f"messages.last_bot_message.{chat_id}": message_id,
+                f"messages.memory_time.{chat_id}": timestamp or time.time(),
+            }
+        )
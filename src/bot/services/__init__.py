@@ -1,9 +1,10 @@
-from .model_services import UserService
+from .model_services import BroadcastService, UserService
 from .model_services.ai_service import AiService
 from .service import Service
 
 __all__ = [
     Service,
     UserService,
-    AiService
+    AiService,
+    BroadcastService
 ]
\ No newline at end of file
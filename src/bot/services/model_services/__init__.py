@@ -1,7 +1,9 @@
 from .ai_service import AiService
+from .broadcast_service import BroadcastService
 from .user_service import UserService
 
 __all__ = [
     UserService,
-    AiService
+    AiService,
+    BroadcastService
 ]
\ No newline at end of file
@@ -1,12 +1,26 @@
+from __future__ import annotations
+
 import asyncio
 import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, AsyncGenerator, AsyncIterator
+
 from loguru import logger
-from agno.agent import Agent
-from agno.models.lmstudio import LMStudio
-from agno.db.mongo import MongoDb
-from agno.media import Image
 
 from ....settings.main import config
+from ...exeptions import AiUnavailableError
+from ...utils.metrics import metrics
+from ..service import Service
+from .context_builder import ContextBuilder
+
+# agno (и openai под ним) импортируется ~1 с — только при первом обращении к ИИ
+# или в фоне после старта (preload), а не при запуске бота
+if TYPE_CHECKING:
+    from agno.agent import Agent
+    from agno.db.mongo import AsyncMongoDb
+    from agno.models.lmstudio import LMStudio
 
 
 SYSTEM_PROMPT = """
@@ -76,18 +90,50 @@ INST="""
 - Знания делают тебя более интересной и глубокой, но не меняют твой характер Миты
 """
 
+# Подставляется agno из dependencies конкретного запуска: агенты общие
+# для всех сообщений сессии, поэтому данные игрока в них не храним
+PLAYER_CONTEXT = """
+user_id: {user_id}
+player_description: {player_description}
+"""
+
+DESCRIBE_INST = """
+Опиши стикер одной короткой фразой на русском, до 150 символов: кто на нём, что делает, какая эмоция.
+Без вступлений и кавычек.
+"""
 
-def create_agent_for_user(
-        user_id: int,
-        session_id: int,
-        player_prompt
-) -> Agent:
 
-    db = MongoDb(
+def preload() -> None:
+    """Импортирует agno заранее (вызывается в потоке после старта бота)."""
+    with metrics.timer("startup.preload_ai"):
+        import agno.agent  # noqa: F401
+        import agno.db.mongo  # noqa: F401
+        import agno.media  # noqa: F401
+        import agno.models.lmstudio  # noqa: F401
+        import openai  # noqa: F401
+
+
+def _unavailable(e: Exception) -> bool:
+    """Модель недоступна по сети (openai к этому моменту уже импортирован агентом)."""
+    from openai import APIConnectionError
+
+    return isinstance(e, APIConnectionError)
+
+
+def create_db() -> AsyncMongoDb:
+    # Асинхронный клиент: под agent.arun синхронный MongoDb читал и писал
+    # сессию блокирующими запросами прямо в event loop
+    from agno.db.mongo import AsyncMongoDb
+
+    return AsyncMongoDb(
         db_name=config.db.name,
         db_url=config.db.url
     )
-    
+
+
+def create_model() -> LMStudio:
+    from agno.models.lmstudio import LMStudio
+
     proxy_url = config.ai_config.http_proxy.get_secret_value() or config.ai_config.https_proxy.get_secret_value() 
     
     if proxy_url:
@@ -105,36 +151,45 @@ def create_agent_for_user(
     if provider == "openai":
         # OpenAI API через LMStudio (OpenAI-совместимый)
         logger.info(f"🔧 Используется OpenAI API: {base_url}, модель: {model_name}")
-        model = LMStudio(
-            id=model_name,
-            api_key=api_key,
-            base_url=base_url
-        )
-    else:
-        # По умолчанию LMStudio
-        logger.info(f"🔧 Используется LMStudio API: {base_url}, модель: {model_name}")
-        model = LMStudio(
+        return LMStudio(
             id=model_name,
             api_key=api_key,
             base_url=base_url
         )
-    
+
+    # По умолчанию LMStudio
+    logger.info(f"🔧 Используется LMStudio API: {base_url}, модель: {model_name}")
+    return LMStudio(
+        id=model_name,
+        api_key=api_key,
+        base_url=base_url
+    )
+
+
+def create_agent_for_user(
+        user_id: int,
+        session_id: int,
+        db: AsyncMongoDb | None = None,
+        model: LMStudio | None = None
+) -> Agent:
+    from agno.agent import Agent
+
     return Agent(
-        model=model,
+        model=model or create_model(),
 
         name="Безумная Мита",
         description=SYSTEM_PROMPT,
-        instructions=INST,
+        instructions=INST + PLAYER_CONTEXT,
 
         markdown=False,
 
         user_id=user_id,
         session_id=session_id,
 
-        db=db,
+        db=db or create_db(),
 
         add_history_to_context=True,         # последние N сообщений
-        num_history_runs=50,                  # детали последних сообщений
+        num_history_runs=config.ai_config.max_history_runs,  # урезается ContextBuilder под бюджет
         
 
         enable_user_memories=False,          # отключено, чтобы не было багов с memory tool
@@ -142,16 +197,147 @@ def create_agent_for_user(
         add_session_summary_to_context=True, # подмешивать summary в контекст
 
         add_datetime_to_context=False,
-        additional_context={
-            "user_id": user_id,
-            "player_description": player_prompt,
-        },
     )
 
 
-class AiService:
-    def __init__(self):
-        pass
+class AiResourcePool:
+    """
+    Общие для процесса ресурсы ИИ.
+
+    Один клиент AsyncMongoDb и одна модель (со своим keep-alive HTTP клиентом)
+    на весь процесс, плюс LRU-кэш агентов по (user_id, session_id),
+    чтобы не собирать всё заново на каждое сообщение. У каждого агента
+    свой lock: запуски одной сессии идут по очереди.
+    """
+
+    def __init__(
+            self,
+            max_agents: int = config.ai_config.agent_cache_size,
+            max_concurrency: int = config.ai_config.max_concurrency
+    ) -> None:
+        self.max_agents = max_agents
+        self._db: AsyncMongoDb | None = None
+        self._model: LMStudio | None = None
+        self._agents: OrderedDict[tuple[int, int], tuple[Agent, asyncio.Lock]] = OrderedDict()
+        self._describer: Agent | None = None
+
+        # Явный лимит одновременных генераций вместо пула потоков
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self.waiting = 0
+        self.in_flight = 0
+
+    @property
+    def db(self) -> AsyncMongoDb:
+        if self._db is None:
+            metrics.incr("ai_pool.db.created")
+            self._db = create_db()
+        return self._db
+
+    @property
+    def model(self) -> LMStudio:
+        if self._model is None:
+            metrics.incr("ai_pool.model.created")
+            self._model = create_model()
+        return self._model
+
+    @property
+    def describer(self) -> Agent:
+        """Агент без истории и БД для коротких описаний картинок."""
+        if self._describer is None:
+            from agno.agent import Agent
+
+            self._describer = Agent(
+                model=self.model,
+                name="Описание стикеров",
+                instructions=DESCRIBE_INST,
+                markdown=False,
+            )
+        return self._describer
+
+    def _entry(self, user_id: int, session_id: int) -> tuple[Agent, asyncio.Lock]:
+        key = (user_id, session_id)
+        entry = self._agents.get(key)
+
+        if entry is not None:
+            metrics.incr("ai_pool.agent.hit")
+            self._agents.move_to_end(key)
+            return entry
+
+        metrics.incr("ai_pool.agent.created")
+        agent = create_agent_for_user(
+            user_id=user_id,
+            session_id=session_id,
+            db=self.db,
+            model=self.model
+        )
+        entry = self._agents[key] = (agent, asyncio.Lock())
+
+        while len(self._agents) > self.max_agents:
+            self._agents.popitem(last=False)
+            metrics.incr("ai_pool.agent.evicted")
+
+        return entry
+
+    def get_agent(self, user_id: int, session_id: int) -> Agent:
+        return self._entry(user_id, session_id)[0]
+
+    @asynccontextmanager
+    async def session(self, user_id: int, session_id: int) -> AsyncIterator[Agent]:
+        """
+        Отдаёт агента сессии на время одного запуска.
+
+        num_history_runs в agno задаётся только на агенте, а не в arun,
+        поэтому запуски одной сессии не должны пересекаться.
+        """
+        agent, lock = self._entry(user_id, session_id)
+        async with lock:
+            yield agent
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Занимает слот генерации, учитывая глубину очереди."""
+        self.waiting += 1
+        metrics.gauge("ai.queue_depth", self.waiting)
+        metrics.gauge(
+            "ai.queue_depth.max",
+            max(self.waiting, metrics.gauges.get("ai.queue_depth.max", 0))
+        )
+        start = time.perf_counter()
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+            metrics.gauge("ai.queue_depth", self.waiting)
+        metrics.observe("ai.queue_wait", time.perf_counter() - start)
+
+        self.in_flight += 1
+        metrics.gauge("ai.in_flight", self.in_flight)
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            metrics.gauge("ai.in_flight", self.in_flight)
+            self._slots.release()
+
+    async def close(self) -> None:
+        self._agents.clear()
+        self._describer = None
+
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+        self._model = None
+
+
+class AiService(Service):
+    def __init__(self, pool: AiResourcePool, context: ContextBuilder):
+        super().__init__()
+        self.pool = pool
+        self.context = context
+
+    async def shutdown(self) -> None:
+        await self.pool.close()
 
 
     async def generate_response(
@@ -159,56 +345,133 @@ class AiService:
         user_id: int,
         session_id: int,
         text: str,
-        image: bytes = None,
+        images: list[bytes] | None = None,
         player_prompt: str = None
     ) -> str:
         
 
         try:
-            agent: Agent = create_agent_for_user(
-                user_id=user_id,
-                session_id=session_id,
-                player_prompt=player_prompt
-            )
-
             kwargs = {}
-            if image:
-                kwargs["images"] = [Image(content=image)]
-
-            response = await asyncio.to_thread(
-                agent.run,
-                text,
-                session_id=session_id,
-                **kwargs
-            )
-
-            # Достаём реальный текст
-            msg = response.messages[-1].content
-
-            if not response:
-                logger.error(f"AI вернул пустой ответ для user_id={user_id}")
-                return None
+            if images:
+                from agno.media import Image
+
+                kwargs["images"] = [Image(content=image) for image in images]
+
+            async with self.pool.session(user_id, session_id) as agent:
+                history_runs = await self.context.prepare(
+                    agent, session_id, SYSTEM_PROMPT, INST, player_prompt, text
+                )
+                # num_history_runs=0 agno трактует как "без ограничения"
+                agent.num_history_runs = history_runs or 1
+
+                async with self.pool.slot():
+                    with metrics.timer("ai.generate"):
+                        response = await agent.arun(
+                            text,
+                            session_id=session_id,
+                            add_history_to_context=history_runs > 0,
+                            dependencies={"player_description": player_prompt},
+                            **kwargs
+                        )
+
+                if not response or not response.messages:
+                    logger.error(f"AI вернул пустой ответ для user_id={user_id}")
+                    return None
+
+                input_tokens = getattr(response.metrics, "input_tokens", None)
+                if input_tokens:
+                    metrics.incr("ai.usage.input_tokens", input_tokens)
+
+                # Достаём реальный текст
+                msg = response.messages[-1].content
+                await self.context.record_run(agent, session_id, text, msg)
             return msg
     
         except Exception as e:
             logger.exception(f"Ошибка в generate_response для user_id={user_id}: {e}")
+            if _unavailable(e):
+                raise AiUnavailableError(str(e)) from e
+            raise
+
+    async def stream_response(
+        self,
+        user_id: int,
+        session_id: int,
+        text: str,
+        images: list[bytes] | None = None,
+        player_prompt: str = None
+    ) -> AsyncGenerator[str, None]:
+        """То же, что generate_response, но отдаёт текст кусками по мере генерации."""
+        from agno.run.agent import RunEvent
+
+        kwargs = {}
+        if images:
+            from agno.media import Image
+
+            kwargs["images"] = [Image(content=image) for image in images]
+
+        reply = ""
+        try:
+            async with self.pool.session(user_id, session_id) as agent:
+                history_runs = await self.context.prepare(
+                    agent, session_id, SYSTEM_PROMPT, INST, player_prompt, text
+                )
+                agent.num_history_runs = history_runs or 1
+
+                async with self.pool.slot():
+                    with metrics.timer("ai.generate"):
+                        async for event in agent.arun(
+                            text,
+                            session_id=session_id,
+                            add_history_to_context=history_runs > 0,
+                            dependencies={"player_description": player_prompt},
+                            stream=True,
+                            **kwargs
+                        ):
+                            if event.event != RunEvent.run_content:
+                                continue
+                            if isinstance(event.content, str) and event.content:
+                                reply += event.content
+                                yield event.content
+
+                await self.context.record_run(agent, session_id, text, reply)
+
+        except Exception as e:
+            logger.exception(f"Ошибка в stream_response для user_id={user_id}: {e}")
+            if _unavailable(e):
+                raise AiUnavailableError(str(e)) from e
             raise
 
+    async def describe_image(self, image: bytes) -> str | None:
+        from agno.media import Image
+
+        async with self.pool.slot():
+            with metrics.timer("ai.describe"):
+                response = await self.pool.describer.arun(
+                    "Опиши этот стикер.",
+                    images=[Image(content=image)]
+                )
+
+        if not response or not isinstance(response.content, str):
+            return None
+        return response.content.strip() or None
+
     async def clear_history(
             self,
             user_id: int
     ) -> bool:
-        agent: Agent = create_agent_for_user(
+        agent: Agent = self.pool.get_agent(
             user_id=user_id,
             session_id=user_id,
-            player_prompt=None,
         )
 
-        session = agent.db.get_session(
+        session = await agent.db.get_session(
             session_id=user_id,
             session_type="agent"
             )
 
+        self.context.forget(user_id)
+
         if not session:
             return False
 
@@ -216,7 +479,7 @@ class AiService:
         session.summary = None
         session.user_memories = []
 
-        agent.save_session(session)
+        await agent.asave_session(session)
 
         return True
 
@@ -0,0 +1,249 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional
+from uuid import uuid4
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramRetryAfter,
+)
+from pymongo import ReturnDocument
+
+from ....settings import config
+from ...db.models import Broadcast
+from ...repositories import UserRepository
+from ...utils.metrics import metrics
+from ...utils.rate_limit import TokenBucket
+from ..service import Service
+
+
+class BroadcastService(Service):
+    """
+    Рассылка поста всем пользователям.
+
+    user_id читаются курсором по возрастанию, отправка идёт пачками
+    с ограниченным числом одновременных запросов и общим темпом
+    (token bucket). После каждой пачки прогресс сохраняется в Broadcast,
+    поэтому после рестарта рассылка продолжается с места остановки.
+
+    Рассылку ведёт тот, кто взял её в аренду (Broadcast.owner): повторно
+    доставленный пост или второй экземпляр бота не отправят его второй раз.
+    """
+
+    max_attempts = 3
+
+    def __init__(
+            self,
+            user_repository: UserRepository,
+            rate: float = config.mailing.rate,
+            workers: int = config.mailing.workers,
+            checkpoint_every: int = config.mailing.checkpoint_every,
+            lease: float = config.mailing.lease
+    ) -> None:
+        super().__init__()
+        self.user_repository = user_repository
+        self.limiter = TokenBucket(capacity=rate, rate=rate)
+        self.workers = workers
+        self.checkpoint_every = checkpoint_every
+        self.lease = timedelta(seconds=lease)
+        self._tasks: set[asyncio.Task] = set()
+
+    async def shutdown(self) -> None:
+        # Прогресс уже в чекпоинтах, run в finally отдаёт аренду
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def start(
+            self,
+            bot: Bot,
+            from_chat_id: int,
+            message_id: int
+    ) -> None:
+        """
+        Запускает рассылку в фоне. Хендлер её не ждёт: рассылка идёт часами,
+        а в webhook Telegram не дождался бы ответа и прислал пост снова.
+        """
+        task = asyncio.create_task(self._start(bot, from_chat_id, message_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _start(self, bot: Bot, from_chat_id: int, message_id: int) -> None:
+        # Один атомарный upsert по уникальному индексу поста
+        doc = await Broadcast.get_pymongo_collection().find_one_and_update(
+            {"from_chat_id": from_chat_id, "message_id": message_id},
+            {"$setOnInsert": Broadcast(
+                from_chat_id=from_chat_id,
+                message_id=message_id
+            ).model_dump(exclude={"id", "revision_id"})},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        await self.run(bot, Broadcast.model_validate(doc))
+
+    async def resume_pending(self, bot: Bot) -> None:
+        """
+        Продолжает незавершённые рассылки. Те, что ведёт другой процесс,
+        проверяются раз в срок аренды: если он упал, рассылку заберём мы.
+        """
+        while pending := await Broadcast.find(Broadcast.done == False).to_list():  # noqa: E712
+            busy = [
+                broadcast for broadcast in pending
+                if not (await self.run(bot, broadcast)).done
+            ]
+            if not busy:
+                return
+            await asyncio.sleep(self.lease.total_seconds())
+
+    async def _claim(self, broadcast: Broadcast) -> Optional[Broadcast]:
+        """Берёт рассылку в аренду, если её никто не ведёт или аренда истекла."""
+        now = datetime.now()
+        doc = await Broadcast.get_pymongo_collection().find_one_and_update(
+            {
+                "_id": broadcast.id,
+                "done": False,
+                "$or": [{"lease_until": None}, {"lease_until": {"$lt": now}}]
+            },
+            {"$set": {"owner": uuid4().hex, "lease_until": now + self.lease}},
+            return_document=ReturnDocument.AFTER
+        )
+        # Прогресс мог уйти вперёд, пока рассылку вёл другой
+        return Broadcast.model_validate(doc) if doc else None
+
+    async def _checkpoint(self, broadcast: Broadcast) -> bool:
+        """Сохраняет прогресс и продлевает аренду; False — аренду перехватили."""
+        result = await Broadcast.get_pymongo_collection().update_one(
+            {"_id": broadcast.id, "owner": broadcast.owner},
+            {"$set": {
+                "last_user_id": broadcast.last_user_id,
+                "sent": broadcast.sent,
+                "failed": broadcast.failed,
+                "done": broadcast.done,
+                "finished_at": broadcast.finished_at,
+                "lease_until": datetime.now() + self.lease
+            }}
+        )
+        if not result.matched_count:
+            self.logger.warning(f"Рассылку {broadcast.message_id} перехватил другой процесс, останавливаемся")
+        return bool(result.matched_count)
+
+    async def _release(self, broadcast: Broadcast) -> None:
+        try:
+            await Broadcast.get_pymongo_collection().update_one(
+                {"_id": broadcast.id, "owner": broadcast.owner},
+                {"$set": {"owner": None, "lease_until": None}}
+            )
+        except Exception as e:
+            # Аренда истечёт сама через MAILING_LEASE
+            self.logger.warning(f"Не удалось освободить рассылку {broadcast.message_id}: {e}")
+
+    async def run(self, bot: Bot, broadcast: Broadcast) -> Broadcast:
+        if broadcast.done:
+            return broadcast
+
+        claimed = await self._claim(broadcast)
+        if claimed is None:
+            self.logger.info(f"Рассылку {broadcast.message_id} уже ведёт другой процесс")
+            return broadcast
+
+        try:
+            return await self._run(bot, claimed)
+        finally:
+            await self._release(claimed)
+
+    async def _run(self, bot: Bot, broadcast: Broadcast) -> Broadcast:
+        if broadcast.last_user_id is not None:
+            self.logger.info(
+                f"Продолжаем рассылку {broadcast.message_id} после user_id={broadcast.last_user_id}"
+            )
+
+        semaphore = asyncio.Semaphore(self.workers)
+        started_at = time.perf_counter()
+        sent_before = broadcast.sent + broadcast.failed
+
+        async def send(user_id: int) -> bool:
+            async with semaphore:
+                return await self._send(bot, broadcast, user_id)
+
+        batch: list[int] = []
+        async for user_id in self.user_repository.iter_user_ids(after=broadcast.last_user_id):
+            batch.append(user_id)
+            if len(batch) >= self.checkpoint_every:
+                if not await self._process(broadcast, batch, send, started_at, sent_before):
+                    return broadcast
+                batch = []
+
+        if batch and not await self._process(broadcast, batch, send, started_at, sent_before):
+            return broadcast
+
+        broadcast.done = True
+        broadcast.finished_at = datetime.now()
+        if not await self._checkpoint(broadcast):
+            return broadcast
+
+        elapsed = time.perf_counter() - started_at
+        processed = broadcast.sent + broadcast.failed - sent_before
+        self.logger.success(
+            f"Рассылка {broadcast.message_id} завершена: отправлено {broadcast.sent}, "
+            f"ошибок {broadcast.failed}, {processed / elapsed if elapsed else 0:.1f} сообщ./сек"
+        )
+        return broadcast
+
+    async def _process(
+            self,
+            broadcast: Broadcast,
+            batch: list[int],
+            send: Callable[[int], Awaitable[bool]],
+            started_at: float,
+            sent_before: int
+    ) -> bool:
+        results = await asyncio.gather(*(send(user_id) for user_id in batch))
+
+        broadcast.sent += sum(results)
+        broadcast.failed += len(results) - sum(results)
+        broadcast.last_user_id = batch[-1]
+        if not await self._checkpoint(broadcast):
+            return False
+
+        elapsed = time.perf_counter() - started_at
+        processed = broadcast.sent + broadcast.failed - sent_before
+        throughput = processed / elapsed if elapsed else 0
+        metrics.gauge("broadcast.throughput", throughput)
+        self.logger.info(
+            f"Рассылка {broadcast.message_id}: отправлено {broadcast.sent}, "
+            f"ошибок {broadcast.failed}, {throughput:.1f} сообщ./сек"
+        )
+        return True
+
+    async def _send(self, bot: Bot, broadcast: Broadcast, user_id: int) -> bool:
+        for _ in range(self.max_attempts):
+            await self.limiter.acquire()
+            try:
+                await bot.copy_message(
+                    chat_id=user_id,
+                    from_chat_id=broadcast.from_chat_id,
+                    message_id=broadcast.message_id
+                )
+                metrics.incr("broadcast.sent")
+                return True
+
+            except TelegramRetryAfter as e:
+                # Flood control — притормаживаем всю рассылку, не только этот чат
+                metrics.incr("broadcast.retry_after")
+                self.limiter.pause(e.retry_after)
+
+            except (TelegramForbiddenError, TelegramBadRequest) as e:
+                # Бот заблокирован / чат не найден — повтор не поможет
+                metrics.incr("broadcast.failed")
+                self.logger.debug(f"Рассылка {user_id}: {e}")
+                return False
+
+            except Exception as e:
+                self.logger.warning(f"Ошибка при рассылке {user_id}: {e}")
+                await asyncio.sleep(1)
+
+        metrics.incr("broadcast.failed")
+        return False
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from functools import cache
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+from ....settings.main import config
+from ...utils.cache import TTLCache
+from ...utils.metrics import metrics
+
+if TYPE_CHECKING:
+    from agno.agent import Agent
+
+
+@cache
+def _encoding():
+    """Токенизатор грузится при первой оценке, а не при старте бота."""
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:  # tiktoken необязателен, без него считаем по символам
+        return None
+
+
+def estimate_tokens(text: str | None) -> int:
+    """Локальная оценка количества токенов в тексте."""
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    # Грубая оценка: ~3 символа на токен (для кириллицы ближе к правде, чем 4)
+    return len(text) // 3 + 1
+
+
+@dataclass
+class _SessionContext:
+    runs: deque[int]
+    summary: int = 0  # токенов в session summary
+
+
+class ContextBuilder:
+    """
+    Подбирает, сколько прошлых запусков агента влезает в бюджет токенов.
+
+    Размер каждого запуска (вопрос + ответ) держим в памяти по session_id:
+    из базы сессия читается один раз, дальше размеры дописываются после
+    каждого ответа. Старые запуски отбрасываются первыми — их содержание
+    и так попадает в session summary, поэтому её размер перечитывается
+    после каждого ответа. Сессии хранятся в LRU с TTL, как и агенты.
+    """
+
+    def __init__(
+            self,
+            token_budget: int = config.ai_config.context_token_budget,
+            max_history_runs: int = config.ai_config.max_history_runs,
+            cache_size: int = config.ai_config.context_cache_size,
+            cache_ttl: float = config.ai_config.context_cache_ttl
+    ) -> None:
+        self.token_budget = token_budget
+        self.max_history_runs = max_history_runs
+        self._sessions: TTLCache[int, _SessionContext] = TTLCache(
+            maxsize=cache_size,
+            ttl=cache_ttl,
+            name="ai.context.cache"
+        )
+
+    @staticmethod
+    def _summary_tokens(session) -> int:
+        if session is None or not session.summary:
+            return 0
+        return estimate_tokens(session.summary.summary)
+
+    async def _load(self, agent: Agent, session_id: int) -> _SessionContext:
+        context = self._sessions.get(session_id)
+        if context is not None:
+            return context
+
+        context = _SessionContext(runs=deque(maxlen=self.max_history_runs))
+        session = await agent.db.get_session(
+            session_id=session_id,
+            session_type="agent",
+            runs_limit=self.max_history_runs
+        )
+
+        if session:
+            for run in session.runs or []:
+                context.runs.append(sum(
+                    estimate_tokens(m.content if isinstance(m.content, str) else None)
+                    for m in run.messages or []
+                    if m.role in ("user", "assistant") and not m.from_history
+                ))
+            context.summary = self._summary_tokens(session)
+
+        self._sessions.set(session_id, context)
+        return context
+
+    async def prepare(
+            self,
+            agent: Agent,
+            session_id: int,
+            *prompt_parts: str | None
+    ) -> int:
+        """
+        Считает, сколько последних запусков влезает в бюджет.
+        Агента не меняет — он общий для всех запросов сессии.
+        """
+        context = await self._load(agent, session_id)
+        runs = context.runs
+
+        prompt_tokens = context.summary + sum(
+            estimate_tokens(part) for part in prompt_parts
+        )
+
+        history_runs = 0
+        for run_tokens in reversed(runs):
+            if prompt_tokens + run_tokens > self.token_budget:
+                break
+            prompt_tokens += run_tokens
+            history_runs += 1
+
+        dropped = len(runs) - history_runs
+        if dropped:
+            metrics.incr("ai.context.dropped_runs", dropped)
+
+        metrics.incr("ai.context.requests")
+        metrics.incr("ai.context.prompt_tokens", prompt_tokens)
+        metrics.gauge("ai.context.prompt_tokens.last", prompt_tokens)
+        logger.debug(
+            f"Контекст session_id={session_id}: ~{prompt_tokens} токенов, "
+            f"история {history_runs}/{len(runs)} запусков"
+        )
+        return history_runs
+
+    async def record_run(self, agent: Agent, session_id: int, *texts: str | None) -> None:
+        context = self._sessions.peek(session_id)
+        if context is None:
+            return
+        context.runs.append(sum(estimate_tokens(text) for text in texts))
+
+        # agno пересобирает summary после каждого запуска — учитываем новый размер
+        try:
+            session = await agent.db.get_session(
+                session_id=session_id,
+                session_type="agent",
+                runs_limit=1
+            )
+        except Exception as e:
+            logger.warning(f"Не удалось обновить summary session_id={session_id}: {e}")
+            return
+        context.summary = self._summary_tokens(session)
+
+    def forget(self, session_id: int) -> None:
+        self._sessions.pop(session_id)
@@ -1,44 +1,63 @@
 import html
-from io import BytesIO
-from typing import Optional, Union
+from typing import AsyncGenerator, Optional, Union
 
-import aiohttp
-import numpy as np
-import soundfile as sf
-from aiogram.types.chat_member_updated import ChatMemberUpdated
 from aiogram.types.user import User as TelegramUser
 from aiogram_i18n.managers import BaseManager
-from aiogram.types import Message
+from aiogram.types import Message, PhotoSize
 from aiogram import Bot
-from pedalboard import Pedalboard, Reverb
 
+from ....media import jobs
 from ....settings import Config, config
 from ...db.models import User
-from ...repositories import UserRepository
+from ...repositories import StickerRepository, UserRepository
+from ...utils.audio_cache import AudioCache
+from ...utils.cache import TTLCache
+from ...utils.media_executor import MediaExecutor
+from ...utils.metrics import metrics
+from ...utils.tts_client import TtsClient
+from ...utils.voice_uploader import VoiceUploader
 from ..model_services.ai_service import AiService
 from ..service import Service
 
 import asyncio
-import requests
 from pathlib import Path
 
-BASE_URL = "http://127.0.0.1:8000"
-SPK_ID = "d3311f8f9ffe"
-
 
 class UserService(Service):
-    data: User | None
-
     def __init__(
             self,
             user_repository: UserRepository,
-            ai_service: AiService
+            ai_service: AiService,
+            tts_client: TtsClient,
+            audio_cache: AudioCache,
+            voice_uploader: VoiceUploader,
+            media: MediaExecutor,
+            image_cache: TTLCache[str, bytes],
+            sticker_repository: StickerRepository
     ) -> None:
         super().__init__()
         self.user_repository = user_repository
         self.ai_service = ai_service
-        self.data = None
+        self.tts_client = tts_client
+        self.audio_cache = audio_cache
+        self.voice_uploader = voice_uploader
+        self.media = media
+        self.image_cache = image_cache
+        self.sticker_repository = sticker_repository
         self.config = self.get_env()
+        # Фоновые задачи и стикеры, которые сейчас описываются
+        self._background: set[asyncio.Task] = set()
+        self._describing: set[str] = set()
+
+    async def startup(self) -> None:
+        self.media.start()
+
+    async def shutdown(self) -> None:
+        for task in self._background:
+            task.cancel()
+        await asyncio.gather(*self._background, return_exceptions=True)
+        await self.tts_client.close()
+        self.media.close()
 
     async def get_data(
         self,
@@ -57,14 +76,13 @@ class UserService(Service):
                 user_id=search_argument,
             )
 
-        self.data = user
         return user
 
     async def ask_ai(
             self,
             user_id: int,
             text: str,
-            image: bytes =  None
+            images: list[bytes] | None = None
     ) -> str:
         user = await self.get_data(user_id)
 
@@ -73,11 +91,32 @@ class UserService(Service):
             session_id=user_id,
             text=text,
             player_prompt=user.settings.player_prompt if user.settings.player_prompt else None,
-            image=image
+            images=images
             )
 
 
         return ai_response
+
+    async def stream_ai(
+            self,
+            user_id: int,
+            text: str,
+            images: list[bytes] | None = None
+    ) -> AsyncGenerator[str, None]:
+        user = await self.get_data(user_id)
+
+        chunks = self.ai_service.stream_response(
+            user_id=user_id,
+            session_id=user_id,
+            text=text,
+            player_prompt=user.settings.player_prompt if user.settings.player_prompt else None,
+            images=images
+        )
+        try:
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await chunks.aclose()
     
     async def images(
             self,
@@ -87,41 +126,53 @@ class UserService(Service):
         try:
             # Фото
             if message.photo:
-                file = await bot.download(message.photo[-1].file_id)
-                return message.caption or "Что ты видишь на этом фото? Какая твоя реакция?", file.read()
+                photo = self._pick_photo(message.photo)
+                image = self.image_cache.get(photo.file_unique_id)
+                if image is None:
+                    image = await self._prepare_image(
+                        bot=bot,
+                        file_id=photo.file_id
+                    )
+                    if image is None:
+                        return None, None
+                    self.image_cache.set(photo.file_unique_id, image)
+                return message.caption or "Что ты видишь на этом фото? Какая твоя реакция?", image
 
             # Стикеры
             if message.sticker:
-                from PIL import Image
-                import io
-                import numpy as np
-                import imageio.v3 as iio
-
                 st = message.sticker
-                raw = await bot.download(st.file_id)
-                buf = raw.read()
-
-                # STATIC WEBP → PNG
-                if not st.is_animated and not st.is_video:
-                    img = Image.open(io.BytesIO(buf))
-                    out = io.BytesIO()
-                    img.save(out, format="PNG")
-                    return message.caption or "Что ты видишь на этом стикере? Какая твоя реакция?", out.getvalue()
 
                 # TGS → unsupported for vision
                 if st.is_animated:
                     return None, None
 
-                # VIDEO STICKER WEBM → PNG
-                if st.is_video:
-                    try:
-                        frame = next(iio.imiter(buf, plugin="ffmpeg"))
-                    except Exception:
+                sticker = await self.sticker_repository.get(st.file_unique_id)
+
+                # Стикер уже описан моделью — картинку не отправляем вовсе
+                if sticker and sticker.description and self.config.media.sticker_descriptions:
+                    metrics.incr("sticker.description_used")
+                    return (
+                        f"{message.caption or 'Смотри, какой стикер!'}\n"
+                        f"[Стикер {st.emoji or ''}: {sticker.description}]"
+                    ), None
+
+                image = sticker.image if sticker else None
+
+                # STATIC WEBP / VIDEO STICKER WEBM
+                if image is None:
+                    image = await self._prepare_image(
+                        bot=bot,
+                        file_id=st.file_id,
+                        is_video=bool(st.is_video)
+                    )
+                    if image is None:
                         return None, None
+                    await self.sticker_repository.save_image(st.file_unique_id, image)
 
-                    out = io.BytesIO()
-                    Image.fromarray(frame).save(out, format="PNG")
-                    return message.caption or "Что ты видишь на этом стикере? Какая твоя реакция?", out.getvalue()
+                if self.config.media.sticker_descriptions:
+                    self._describe_sticker_later(st.file_unique_id, image)
+
+                return message.caption or "Что ты видишь на этом стикере? Какая твоя реакция?", image
 
             return None, None
 
@@ -129,6 +180,54 @@ class UserService(Service):
             await message.reply(f"Ошибка изображения: {e}")
             return None, None
         
+    def _pick_photo(self, photos: list[PhotoSize]) -> PhotoSize:
+        """Самый маленький размер, который не меньше image_max_side, иначе самый большой."""
+        max_side = self.config.media.image_max_side
+        for photo in sorted(photos, key=lambda p: p.width * p.height):
+            if max(photo.width, photo.height) >= max_side:
+                return photo
+        return photos[-1]
+
+    async def _prepare_image(
+            self,
+            bot: Bot,
+            file_id: str,
+            is_video: bool = False
+    ) -> Optional[bytes]:
+        raw = await bot.download(file_id)
+        media_config = self.config.media
+        return await self.media.run(
+            "prepare_image",
+            jobs.prepare_image,
+            raw.read(),
+            is_video,
+            media_config.image_max_side,
+            media_config.image_format,
+            media_config.image_quality
+        )
+
+    def _describe_sticker_later(self, file_unique_id: str, image: bytes) -> None:
+        """Описание стикера генерируется в фоне и пригодится со следующего раза."""
+        if file_unique_id in self._describing:
+            return
+        self._describing.add(file_unique_id)
+
+        async def describe() -> None:
+            try:
+                description = await self.ai_service.describe_image(image)
+                if description:
+                    await self.sticker_repository.save_description(
+                        file_unique_id, description[:300]
+                    )
+            except Exception as e:
+                self.logger.warning(f"Не удалось описать стикер {file_unique_id}: {e}")
+            finally:
+                self._describing.discard(file_unique_id)
+
+        task = asyncio.create_task(describe())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
     def get_env(self) -> Config:
         return config
 
@@ -136,84 +235,83 @@ class UserService(Service):
         return [doc.user_id for doc in await self.user_repository.get_all_users()]
 
     async def edge_voice_generate(self, user_id: int, text: str) -> bytes:
-        data = {
-            "text": text,
-            "mode": "zero_shot",
-            "spk_id": SPK_ID,
-            "speed": 1.0,
-        }
-
-        async with aiohttp.ClientSession() as session:
-            # 1. Отправляем запрос на создание задачи (POST)
-            async with session.post(f"{BASE_URL}/api/tts/async", data=data) as response:
-                response.raise_for_status()
-                result = await response.json()
-                task_id = result["task_id"]
-
-            # 2. Ожидаем завершения задачи (Polling)
-            filename = None
-            while True:
-                await asyncio.sleep(0.5)
-                async with session.get(f"{BASE_URL}/api/task/{task_id}") as response:
-                    response.raise_for_status()
-                    status_data = await response.json()
-
-                    if status_data["status"] == "completed":
-                        filename = status_data["output_file"]
-                        break
-                    if status_data["status"] == "failed":
-                        raise RuntimeError(status_data.get("error", "Unknown error"))
-
-            # 3. Скачиваем готовый файл (GET)
-            async with session.get(f"{BASE_URL}/api/download/{filename}") as response:
-                response.raise_for_status()
-                return await response.read()
-        
-
+        mode = "zero_shot"
+        speed = 1.0
+
+        key = self.audio_cache.key(
+            text,
+            engine="local_tts",
+            spk_id=self.tts_client.spk_id,
+            mode=mode,
+            speed=speed
+        )
+        return await self.audio_cache.get_or_create(
+            key,
+            lambda: self.tts_client.synthesize(
+                text=text,
+                mode=mode,
+                speed=speed
+            )
+        )
 
     async def apply_voice_effect(
             self,
             voice_bytes: bytes
         ) -> bytes:
         self.logger.info("Попытка применения эффека для голосового")
-        audio_buffer = BytesIO(voice_bytes)
-        samples, samplerate = sf.read(audio_buffer, dtype='float32')
-
-        samples += np.random.normal(0, 0.00005, samples.shape).astype(np.float32)
-
-        board = Pedalboard([Reverb(room_size=0.01, damping=0.8, wet_level=0.1)])
-        processed = board(samples, samplerate)
-
-        out_buffer = BytesIO()
-        sf.write(out_buffer, processed, samplerate, format='OGG', subtype='VORBIS')
-        out_buffer.seek(0)
+        result = await self.media.run(
+            "voice_effect",
+            jobs.apply_voice_effect,
+            voice_bytes,
+            self.config.media.voice_preset,
+            self.config.media.voice_codec
+        )
         self.logger.success("Эффект для голосового, был применен успешно")
-        return out_buffer.read()
+        return result
 
     class UserManager(BaseManager):
-        def __init__(self, user_repository: UserRepository):
+        """
+        Локаль для aiogram_i18n. Вызывается на каждый апдейт до хендлеров,
+        поэтому берётся из кэша в памяти; в базу — только при первом
+        обращении пользователя и только чтением (документ не создаётся).
+        """
+
+        def __init__(
+                self,
+                user_repository: UserRepository,
+                cache: Optional[TTLCache[int, str]] = None
+        ):
             super().__init__()
             self.user_repository = user_repository
+            # user_id -> локаль, set_locale пишет сюда сквозь базу
+            self.cache = cache if cache is not None else TTLCache(
+                maxsize=config.db.locale_cache_size,
+                name="locale_cache"
+            )
 
         async def get_locale(
                 self,
-                event: ChatMemberUpdated
+                event_from_user: Optional[TelegramUser] = None
         ) -> str:
-            if hasattr(event, "from_user") and event.from_user:
-                tg_user: TelegramUser = event.from_user
-            else:
-                tg_user = None
-            
-            if tg_user:
-                user = await self.user_repository.select(user_id=tg_user.id)
-                return user.settings.locale if user else self.default_locale
-            return self.default_locale
-    
+            # Middleware i18n висит на Update, пользователя отдаёт aiogram в event_from_user
+            if event_from_user is None:
+                return self.default_locale
+
+            locale = self.cache.get(event_from_user.id)
+            if locale is None:
+                locale = (
+                    await self.user_repository.get_locale(event_from_user.id)
+                    or self.default_locale
+                )
+                self.cache.set(event_from_user.id, locale)
+            return locale
+
         async def set_locale(
                 self,
                 locale: str,
-                event: ChatMemberUpdated
+                event_from_user: Optional[TelegramUser] = None
         ) -> None:
-            if hasattr(event, "from_user") and event.from_user:
-                tg_user: TelegramUser = event.from_user
-                await self.user_repository.update_locale(tg_user.id, locale)
\ No newline at end of file
+            if event_from_user is None:
+                return
+            await self.user_repository.update_locale(event_from_user.id, locale)
+            self.cache.set(event_from_user.id, locale)
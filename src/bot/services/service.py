@@ -4,5 +4,17 @@ from loguru import logger
 
 
 class Service(ABC):
+    """
+    Сервисы живут весь процесс (Singleton в контейнере).
+    startup/shutdown вызываются из dp.startup/dp.shutdown: здесь открываются
+    и закрываются пулы и клиенты, которыми владеет сервис.
+    """
+
     def __init__(self):
-        self.logger = logger.bind(name=self.__class__.__name__)
\ No newline at end of file
+        self.logger = logger.bind(name=self.__class__.__name__)
+
+    async def startup(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
\ No newline at end of file
@@ -0,0 +1,25 @@
+"""
+Sharding - обработка апдейтов в нескольких процессах
+
+Фронт-процесс получает апдейты и раскладывает их по воркерам по user_id
+(или chat_id), так что апдейты одного пользователя всегда попадают в один
+процесс (его кэши, склейка запросов и лимиты — там же). Воркеры — полноценные экземпляры бота
+(свой Dispatcher, контейнер и подключение к базе), апдейты в них подаются
+через ``Dispatcher.feed_raw_update``.
+
+Здесь — только лёгкие части без aiogram и настроек: их используют тесты
+и бенчмарки. Запуск: ``front.run_sharded``.
+"""
+from .dispatch import serve_shard, shard_for, shard_key, split_by_shard
+from .transport import LocalTransport, ProcessTransport, ShardDeadError, ShardTransport
+
+__all__ = [
+    "LocalTransport",
+    "ProcessTransport",
+    "ShardDeadError",
+    "ShardTransport",
+    "serve_shard",
+    "shard_for",
+    "shard_key",
+    "split_by_shard",
+]
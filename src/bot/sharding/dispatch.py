@@ -0,0 +1,126 @@
+"""
+Раскладка апдейтов по шардам и их обработка внутри шарда.
+"""
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+from loguru import logger
+
+from .transport import ShardTransport, Update
+
+# Типы апдейтов, в которых есть отправитель (from) и/или чат
+_EVENT_KINDS = (
+    "message",
+    "edited_message",
+    "callback_query",
+    "chat_member",
+    "my_chat_member",
+    "inline_query",
+    "chosen_inline_result",
+    "pre_checkout_query",
+    "shipping_query",
+    "chat_join_request",
+    "channel_post",
+    "edited_channel_post",
+)
+
+
+def shard_key(update: Update) -> int:
+    """
+    Ключ упорядочивания: id пользователя, иначе id чата, иначе update_id.
+    Личка и группы одного пользователя попадают в один шард — как и его
+    кэши, очередь запросов к ИИ и лимиты.
+    """
+    for kind in _EVENT_KINDS:
+        event = update.get(kind)
+        if not event:
+            continue
+        user = event.get("from")
+        if user:
+            return user["id"]
+        chat = event.get("chat") or (event.get("message") or {}).get("chat")
+        if chat:
+            return chat["id"]
+    return update["update_id"]
+
+
+def shard_for(update: Update, shards: int) -> int:
+    return shard_key(update) % shards
+
+
+def split_by_shard(updates: list[Update], shards: int) -> dict[int, list[Update]]:
+    """Раскладывает пачку по шардам, сохраняя порядок внутри каждого."""
+    by_shard: dict[int, list[Update]] = {}
+    for update in updates:
+        by_shard.setdefault(shard_for(update, shards), []).append(update)
+    return by_shard
+
+
+async def serve_shard(
+        transport: ShardTransport,
+        shard: int,
+        feed: Callable[[Update], Awaitable[Any]],
+        max_in_flight: int = 256,
+        max_per_key: int = 16,
+        max_queued_per_key: int = 100,
+        max_pending: int = 10000
+) -> None:
+    """
+    Читает апдейты шарда до закрытия транспорта и отдаёт их в feed.
+
+    Как и в обычном polling aiogram, апдейты обрабатываются параллельно, в том
+    числе апдейты одного пользователя: иначе RequestCoalescer нечего склеивать.
+    По порядку у пользователя только начинается обработка.
+
+    На один ключ — не больше max_per_key апдейтов одновременно. Остальные ждут
+    в очереди ключа и общих слотов (max_in_flight) не занимают, так что флуд
+    одного пользователя не останавливает шард. Сверх max_queued_per_key апдейты
+    ключа отбрасываются. Всего принятых и не обработанных — не больше
+    max_pending: дальше шард перестаёт читать транспорт.
+    """
+    slots = asyncio.Semaphore(max_in_flight)
+    pending = asyncio.Semaphore(max_pending)
+    queues: dict[int, deque[Update]] = {}
+    runners: dict[int, int] = {}
+    flooding: set[int] = set()
+    tasks: set[asyncio.Task] = set()
+
+    async def run(key: int) -> None:
+        queue = queues[key]
+        try:
+            while queue:
+                update = queue.popleft()
+                try:
+                    async with slots:
+                        await feed(update)
+                except Exception as e:
+                    logger.exception(f"Шард {shard}: ошибка в апдейте {update.get('update_id')}: {e}")
+                finally:
+                    pending.release()
+        finally:
+            runners[key] -= 1
+            if not runners[key]:
+                # Очередь пуста: последний обработчик выходит, только разобрав её
+                del runners[key], queues[key]
+                flooding.discard(key)
+
+    while (batch := await transport.receive(shard)) is not None:
+        for update in batch:
+            key = shard_key(update)
+            if len(queues.get(key, ())) >= max_queued_per_key:
+                if key not in flooding:
+                    flooding.add(key)
+                    logger.warning(f"Шард {shard}: очередь ключа {key} переполнена, лишние апдейты отбрасываются")
+                continue
+
+            await pending.acquire()
+            # Пока ждали, очередь ключа могли разобрать и удалить
+            queues.setdefault(key, deque()).append(update)
+            if runners.get(key, 0) < max_per_key:
+                runners[key] = runners.get(key, 0) + 1
+                task = asyncio.create_task(run(key))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+    await asyncio.gather(*tasks, return_exceptions=True)
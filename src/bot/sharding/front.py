@@ -0,0 +1,152 @@
+"""
+Фронт и воркеры шардинга.
+
+Фронт сам опрашивает getUpdates через aiohttp и не разбирает апдейты в
+pydantic-модели: достаёт из JSON только id для маршрутизации. Всё тяжёлое
+(модели aiogram, фильтры, Beanie, ИИ) — в воркерах.
+"""
+import asyncio
+import multiprocessing
+from typing import Any
+
+from aiohttp import ClientError, ClientSession, ClientTimeout
+from loguru import logger
+
+from ...settings.main import config
+from ..utils.metrics import metrics
+from .dispatch import serve_shard, split_by_shard
+from .transport import ProcessTransport, ShardDeadError, ShardTransport
+
+API_URL = "https://api.telegram.org"
+POLL_TIMEOUT = 30  # секунд long polling на один getUpdates
+
+
+class BotApiError(RuntimeError):
+    pass
+
+
+async def _call(session: ClientSession, method: str, **params: Any) -> Any:
+    token = config.telegram.bot_token.get_secret_value()
+    async with session.post(f"{API_URL}/bot{token}/{method}", json=params) as response:
+        data = await response.json()
+    if not data.get("ok"):
+        raise BotApiError(f"{method}: {data.get('description')}")
+    return data["result"]
+
+
+async def poll_updates(
+        transport: ShardTransport,
+        allowed_updates: list[str]
+) -> None:
+    """Long polling без разбора апдейтов: каждый уходит в шард своего пользователя."""
+    timeout = ClientTimeout(total=POLL_TIMEOUT + 10)
+    async with ClientSession(timeout=timeout) as session:
+        # Как drop_pending_updates у start_polling
+        await _call(session, "deleteWebhook", drop_pending_updates=True)
+        offset = None
+        backoff = 1.0
+
+        while True:
+            try:
+                updates = await _call(
+                    session,
+                    "getUpdates",
+                    offset=offset,
+                    timeout=POLL_TIMEOUT,
+                    allowed_updates=allowed_updates
+                )
+            except (ClientError, asyncio.TimeoutError, BotApiError) as e:
+                logger.error(f"getUpdates не удался, повтор через {backoff:.0f} с: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+                continue
+
+            backoff = 1.0
+            # До раздачи: неподтверждённые апдейты Telegram отдаст снова после перезапуска
+            transport.check()
+            if not updates:
+                continue
+            offset = updates[-1]["update_id"] + 1
+            for shard, batch in split_by_shard(updates, transport.shards).items():
+                await transport.send(shard, batch)
+            metrics.incr("shard.front.updates", len(updates))
+
+
+async def run_worker(transport: ShardTransport, shard: int) -> None:
+    """Воркер: полноценный бот, получающий апдейты из своей очереди."""
+    # Импорт здесь: фронту сборка бота не нужна
+    from ..app import create_bot, create_dispatcher
+
+    bot = create_bot()
+    dp, _ = await create_dispatcher(
+        bot,
+        primary=shard == 0,
+        # /ban мог выполниться в другом воркере
+        blocked_refresh=config.shard.blocked_refresh
+    )
+
+    async def feed(update: dict) -> None:
+        await dp.feed_raw_update(bot, update)
+        metrics.incr("shard.worker.updates")
+
+    await dp.emit_startup(bot=bot)
+    logger.info(f"Шард {shard} запущен")
+    try:
+        await serve_shard(
+            transport,
+            shard,
+            feed,
+            max_in_flight=config.shard.max_in_flight,
+            max_per_key=config.shard.max_per_user,
+            max_queued_per_key=config.shard.max_queued_per_user,
+            max_pending=config.shard.queue_size
+        )
+    finally:
+        await dp.emit_shutdown(bot=bot)
+        await bot.session.close()
+
+
+def worker_process(transport: ShardTransport, shard: int) -> None:
+    """Точка входа процесса-воркера (функция уровня модуля — для spawn)."""
+    try:
+        asyncio.run(run_worker(transport, shard))
+    except KeyboardInterrupt:
+        pass
+
+
+async def run_sharded(allowed_updates: list[str]) -> None:
+    shards = config.shard.workers
+    if config.webhook.enabled:
+        logger.warning("В режиме шардинга апдейты получаются polling'ом, WEBHOOK_ENABLED игнорируется")
+    transport = ProcessTransport(shards, maxsize=config.shard.queue_size)
+
+    ctx = multiprocessing.get_context("spawn")
+    processes = [
+        ctx.Process(
+            target=worker_process,
+            args=(transport, shard),
+            name=f"bot-shard-{shard}"
+        )
+        for shard in range(shards)
+    ]
+    for process in processes:
+        process.start()
+    transport.attach(processes)
+    logger.info(f"Шардинг: {shards} воркеров, фронт опрашивает getUpdates")
+
+    try:
+        await poll_updates(transport, allowed_updates)
+    except ShardDeadError as e:
+        # Перезапуск одного воркера небезопасен: умерев с блокировкой очереди,
+        # он мог её сломать. Останавливаем всё — бот перезапустит супервизор
+        logger.critical(f"Воркер шардинга упал, бот останавливается: {e}")
+        raise
+    finally:
+        # Воркеры дорабатывают то, что уже в очереди, и выходят
+        await transport.close()
+        for process in processes:
+            await asyncio.to_thread(process.join, config.shard.shutdown_timeout)
+            if process.is_alive():
+                logger.warning(f"{process.name} не завершился, останавливаю")
+                process.terminate()
+        metrics.log_summary()
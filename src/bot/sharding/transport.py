@@ -0,0 +1,154 @@
+"""
+Транспорт апдейтов от фронта к воркерам: очередь на каждый шард.
+
+- LocalTransport — asyncio.Queue в одном процессе (тесты, отладка).
+- ProcessTransport — multiprocessing.Queue между процессами.
+
+Апдейты передаются сырыми dict из ответа Bot API, без pydantic-моделей,
+и пачками: одна запись в очереди на шард за ответ getUpdates, а не на апдейт.
+``receive`` отдаёт всё, что накопилось, или None после ``close``.
+Если получатель умер, ``send`` и ``check`` бросают ShardDeadError.
+"""
+import asyncio
+import multiprocessing
+import queue
+from abc import ABC, abstractmethod
+from multiprocessing.process import BaseProcess
+from typing import Optional
+
+Update = dict
+
+
+class ShardDeadError(RuntimeError):
+    """Воркер шарда завершился — его очередь больше никто не читает."""
+
+
+class ShardTransport(ABC):
+    def __init__(self, shards: int) -> None:
+        self.shards = shards
+        # Шарды, в чьей очереди уже встретился конец потока (на стороне получателя)
+        self._closed: set[int] = set()
+
+    def _until_closed(
+            self,
+            shard: int,
+            batches: list[Optional[list[Update]]]
+    ) -> Optional[list[Update]]:
+        """Склеивает пачки до None (конец потока); None — если апдейтов не осталось."""
+        updates = []
+        for batch in batches:
+            if batch is None:
+                self._closed.add(shard)
+                return updates or None
+            updates.extend(batch)
+        return updates
+
+    @abstractmethod
+    async def send(self, shard: int, updates: list[Update]) -> None:
+        ...
+
+    @abstractmethod
+    async def receive(self, shard: int) -> Optional[list[Update]]:
+        ...
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Сообщает всем шардам, что апдейтов больше не будет."""
+
+    def check(self) -> None:
+        """Проверяет, что получатели живы; иначе ShardDeadError."""
+
+
+class LocalTransport(ShardTransport):
+    def __init__(self, shards: int, maxsize: int = 0) -> None:
+        super().__init__(shards)
+        self._queues: list[asyncio.Queue] = [
+            asyncio.Queue(maxsize) for _ in range(shards)
+        ]
+
+    async def send(self, shard: int, updates: list[Update]) -> None:
+        await self._queues[shard].put(updates)
+
+    async def receive(self, shard: int) -> Optional[list[Update]]:
+        if shard in self._closed:
+            return None
+        q = self._queues[shard]
+        batches = [await q.get()]
+        while not q.empty():
+            batches.append(q.get_nowait())
+        return self._until_closed(shard, batches)
+
+    async def close(self) -> None:
+        for q in self._queues:
+            await q.put(None)
+
+
+class ProcessTransport(ShardTransport):
+    """
+    Очереди создаются в контексте spawn (как на Windows), поэтому объект
+    можно передать в аргументах multiprocessing.Process.
+
+    После запуска воркеров их нужно передать в ``attach``: без этого отправка
+    в очередь умершего воркера ждала бы освобождения места вечно.
+    """
+
+    # Пока очередь шарда полна, фронт ждёт — так воркеры тормозят приём
+    _full_backoff = 0.01
+
+    def __init__(self, shards: int, maxsize: int = 0) -> None:
+        super().__init__(shards)
+        ctx = multiprocessing.get_context("spawn")
+        self._queues = [ctx.Queue(maxsize) for _ in range(shards)]
+        self._workers: list[BaseProcess] = []
+
+    def __getstate__(self) -> dict:
+        # Воркерам достаются только очереди: объекты процессов не сериализуются
+        state = self.__dict__.copy()
+        state["_workers"] = []
+        return state
+
+    def attach(self, workers: list[BaseProcess]) -> None:
+        """Процессы-получатели по номеру шарда."""
+        self._workers = workers
+
+    def _alive(self, shard: int) -> bool:
+        return not self._workers or self._workers[shard].is_alive()
+
+    def _check_shard(self, shard: int) -> None:
+        if not self._alive(shard):
+            worker = self._workers[shard]
+            raise ShardDeadError(f"{worker.name} завершился с кодом {worker.exitcode}")
+
+    def check(self) -> None:
+        for shard in range(self.shards):
+            self._check_shard(shard)
+
+    async def _put(self, shard: int, item: Optional[list[Update]]) -> None:
+        while True:
+            try:
+                self._queues[shard].put_nowait(item)
+                return
+            except queue.Full:
+                self._check_shard(shard)
+                await asyncio.sleep(self._full_backoff)
+
+    async def send(self, shard: int, updates: list[Update]) -> None:
+        await self._put(shard, updates)
+
+    async def receive(self, shard: int) -> Optional[list[Update]]:
+        if shard in self._closed:
+            return None
+        q = self._queues[shard]
+        # Блокирующее ожидание — в потоке, дальше забираем без ожидания
+        batches = [await asyncio.to_thread(q.get)]
+        while True:
+            try:
+                batches.append(q.get_nowait())
+            except queue.Empty:
+                break
+        return self._until_closed(shard, batches)
+
+    async def close(self) -> None:
+        for shard in range(self.shards):
+            if self._alive(shard):
+                await self._put(shard, None)
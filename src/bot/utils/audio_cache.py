@@ -0,0 +1,189 @@
+"""
+Audio Cache - кэш сгенерированных голосовых по содержимому
+
+Ключ — sha256 от нормализованного текста и параметров голоса,
+файлы лежат на диске, а LRU-индекс (ключ -> размер) — в памяти.
+При превышении лимита удаляются самые давно использованные файлы.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+from loguru import logger
+
+from ...settings import config
+from .cache import TTLCache
+from .metrics import metrics
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class AudioCache:
+    suffix = ".audio"
+
+    def __init__(
+            self,
+            directory: str = config.voice_config.cache_dir,
+            max_bytes: int = config.voice_config.cache_max_mb * 1024 * 1024
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._index: OrderedDict[str, int] = OrderedDict()
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._in_flight: dict[str, asyncio.Future] = {}
+        # Telegram file_id по sha256 содержимого; на диске — рядом с аудио
+        self._file_ids: TTLCache[str, str] = TTLCache(maxsize=10000, name="file_id_cache")
+
+    @staticmethod
+    def key(text: str, **params) -> str:
+        payload = json.dumps(
+            {"text": normalize_text(text), **params},
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{self.suffix}"
+
+    def _scan(self) -> list[tuple[str, int]]:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        files = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.name.endswith(self.suffix)),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        return [(Path(entry.name).stem, entry.stat().st_size) for entry in files]
+
+    async def _load(self) -> None:
+        if self._loaded:
+            return
+        # Первые запросы ждут окончания сканирования, а не видят неполный индекс
+        async with self._load_lock:
+            if self._loaded:
+                return
+            for key, size in await asyncio.to_thread(self._scan):
+                self._index[key] = size
+                self.size += size
+            self._loaded = True
+        logger.info(f"Кэш голосовых: {len(self._index)} файлов, {self.size / 1024 / 1024:.1f} МБ")
+
+    async def get(self, key: str) -> Optional[bytes]:
+        await self._load()
+
+        if key not in self._index:
+            metrics.incr("audio_cache.miss")
+            return None
+
+        try:
+            data = await asyncio.to_thread(self._path(key).read_bytes)
+        except FileNotFoundError:
+            self.size -= self._index.pop(key)
+            metrics.incr("audio_cache.miss")
+            return None
+
+        self._index.move_to_end(key)
+        metrics.incr("audio_cache.hit")
+        return data
+
+    def _write(self, key: str, data: bytes) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self._path(key).with_suffix(".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, self._path(key))
+
+    async def put(self, key: str, data: bytes) -> None:
+        await self._load()
+        await asyncio.to_thread(self._write, key, data)
+
+        self.size += len(data) - self._index.get(key, 0)
+        self._index[key] = len(data)
+        self._index.move_to_end(key)
+
+        while self.size > self.max_bytes and len(self._index) > 1:
+            old_key, old_size = self._index.popitem(last=False)
+            self.size -= old_size
+            metrics.incr("audio_cache.evicted")
+            await asyncio.to_thread(self._path(old_key).unlink, missing_ok=True)
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def _file_id_path(self, digest: str) -> Path:
+        return self.directory / "file_ids" / digest
+
+    def _read_file_id(self, digest: str) -> Optional[str]:
+        try:
+            return self._file_id_path(digest).read_text(encoding="utf-8").strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _write_file_id(self, digest: str, file_id: Optional[str]) -> None:
+        path = self._file_id_path(digest)
+        if file_id is None:
+            path.unlink(missing_ok=True)
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(file_id, encoding="utf-8")
+
+    async def get_file_id(self, digest: str) -> Optional[str]:
+        """Telegram file_id уже загруженного клипа (по sha256 содержимого)."""
+        file_id = self._file_ids.get(digest)
+        if file_id is None:
+            file_id = await asyncio.to_thread(self._read_file_id, digest)
+            if file_id is not None:
+                self._file_ids.set(digest, file_id)
+        return file_id
+
+    async def set_file_id(self, digest: str, file_id: Optional[str]) -> None:
+        if file_id is None:
+            self._file_ids.pop(digest)
+        else:
+            self._file_ids.set(digest, file_id)
+        await asyncio.to_thread(self._write_file_id, digest, file_id)
+
+    async def get_or_create(
+            self,
+            key: str,
+            produce: Callable[[], Awaitable[Optional[bytes]]]
+    ) -> Optional[bytes]:
+        """
+        Отдаёт аудио из кэша или генерирует его через produce.
+        Одинаковые запросы, пришедшие одновременно, генерируются один раз.
+        """
+        data = await self.get(key)
+        if data is not None:
+            return data
+
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            metrics.incr("audio_cache.joined")
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            data = await produce()
+            if data:
+                await self.put(key, data)
+            future.set_result(data)
+            return data
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Исключение уже передано ожидающим, не оставляем его "неполученным"
+            future.exception()
+            raise
+        finally:
+            self._in_flight.pop(key, None)
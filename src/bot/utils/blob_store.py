@@ -0,0 +1,151 @@
+"""
+Blob Store - хранилище больших байтовых объектов для FSM
+
+В состоянии FSM хранится только короткий handle, сами байты — здесь:
+в памяти процесса или во временных файлах на диске. Записи живут
+ограниченное время и удаляются, даже если сценарий не был завершён.
+"""
+import asyncio
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional
+
+from ...settings import config
+from .metrics import metrics
+
+
+class BlobStore(ABC):
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+
+    @staticmethod
+    def new_handle() -> str:
+        return uuid.uuid4().hex
+
+    @abstractmethod
+    async def put(self, data: bytes) -> str:
+        """Сохраняет байты и возвращает handle для FSM."""
+
+    @abstractmethod
+    async def get(self, handle: str) -> Optional[bytes]:
+        """Байты по handle или None, если запись удалена/устарела."""
+
+    @abstractmethod
+    async def delete(self, handle: str) -> None:
+        ...
+
+    @property
+    @abstractmethod
+    def held(self) -> tuple[int, int]:
+        """(количество записей, байт всего)."""
+
+    def _report(self) -> None:
+        items, size = self.held
+        metrics.gauge("blob_store.items", items)
+        metrics.gauge("blob_store.bytes", size)
+        metrics.gauge("blob_store.bytes_per_item", size / items if items else 0)
+
+
+class MemoryBlobStore(BlobStore):
+    def __init__(self, ttl: float) -> None:
+        super().__init__(ttl)
+        self._data: dict[str, tuple[float, bytes]] = {}
+        self._size = 0
+
+    def _sweep(self) -> None:
+        now = time.monotonic()
+        for handle in [h for h, (expires_at, _) in self._data.items() if expires_at < now]:
+            self._size -= len(self._data.pop(handle)[1])
+            metrics.incr("blob_store.expired")
+
+    async def put(self, data: bytes) -> str:
+        self._sweep()
+        handle = self.new_handle()
+        self._data[handle] = (time.monotonic() + self.ttl, data)
+        self._size += len(data)
+        self._report()
+        return handle
+
+    async def get(self, handle: str) -> Optional[bytes]:
+        self._sweep()
+        item = self._data.get(handle)
+        return item[1] if item else None
+
+    async def delete(self, handle: str) -> None:
+        item = self._data.pop(handle, None)
+        if item:
+            self._size -= len(item[1])
+        self._report()
+
+    @property
+    def held(self) -> tuple[int, int]:
+        return len(self._data), self._size
+
+
+class DiskBlobStore(BlobStore):
+    def __init__(self, ttl: float, directory: str) -> None:
+        super().__init__(ttl)
+        self.directory = Path(directory)
+        self._sizes: dict[str, int] = {}
+
+    def _path(self, handle: str) -> Path:
+        # handle приходит из FSM — разрешаем только hex, без путей
+        if not handle.isalnum():
+            raise ValueError(f"Некорректный handle: {handle!r}")
+        return self.directory / handle
+
+    def _sweep(self) -> None:
+        if not self.directory.exists():
+            return
+        deadline = time.time() - self.ttl
+        for entry in os.scandir(self.directory):
+            if entry.stat().st_mtime < deadline:
+                Path(entry.path).unlink(missing_ok=True)
+                self._sizes.pop(entry.name, None)
+                metrics.incr("blob_store.expired")
+
+    def _write(self, handle: str, data: bytes) -> None:
+        self._sweep()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._path(handle).write_bytes(data)
+
+    def _read(self, handle: str) -> Optional[bytes]:
+        path = self._path(handle)
+        try:
+            if path.stat().st_mtime < time.time() - self.ttl:
+                return None
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    async def put(self, data: bytes) -> str:
+        handle = self.new_handle()
+        await asyncio.to_thread(self._write, handle, data)
+        self._sizes[handle] = len(data)
+        self._report()
+        return handle
+
+    async def get(self, handle: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self._read, handle)
+
+    async def delete(self, handle: str) -> None:
+        await asyncio.to_thread(self._path(handle).unlink, missing_ok=True)
+        self._sizes.pop(handle, None)
+        self._report()
+
+    @property
+    def held(self) -> tuple[int, int]:
+        return len(self._sizes), sum(self._sizes.values())
+
+
+def create_blob_store(
+        backend: str = config.voice_config.blob_store,
+        ttl: float = config.voice_config.blob_ttl,
+        directory: str = config.voice_config.blob_dir
+) -> BlobStore:
+    if backend == "disk":
+        return DiskBlobStore(ttl=ttl, directory=directory)
+    return MemoryBlobStore(ttl=ttl)
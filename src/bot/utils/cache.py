@@ -0,0 +1,78 @@
+"""
+Cache - LRU кэш в памяти процесса с временем жизни записей
+"""
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, TypeVar
+
+from .metrics import metrics
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Словарь с ограничением размера (LRU) и временем жизни записей.
+
+    Попадания и промахи считаются в metrics как ``<name>.hit`` / ``<name>.miss``.
+    ttl=None — записи не устаревают, вытесняются только по размеру.
+    """
+
+    def __init__(
+            self,
+            maxsize: int,
+            ttl: Optional[float] = None,
+            name: str = "cache"
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def get(self, key: K) -> Optional[V]:
+        item = self._data.get(key)
+
+        if item is None:
+            metrics.incr(f"{self.name}.miss")
+            return None
+
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            metrics.incr(f"{self.name}.miss")
+            return None
+
+        self._data.move_to_end(key)
+        metrics.incr(f"{self.name}.hit")
+        return value
+
+    def peek(self, key: K) -> Optional[V]:
+        """Как get, но без учёта в метриках и без изменения порядка LRU."""
+        item = self._data.get(key)
+        if item is None or item[0] < time.monotonic():
+            return None
+        return item[1]
+
+    def set(self, key: K, value: V) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl else float("inf")
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            metrics.incr(f"{self.name}.evicted")
+
+    def pop(self, key: K) -> Optional[V]:
+        item = self._data.pop(key, None)
+        return item[1] if item else None
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __contains__(self, key: K) -> bool:
+        item = self._data.get(key)
+        return item is not None and item[0] >= time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,66 @@
+"""
+Coalescer - склейка запросов одного пользователя
+
+Запросы по одному ключу (чат + пользователь) выполняются строго по очереди.
+Всё, что пришло за окно debounce или пока предыдущий запрос ещё
+выполнялся, склеивается в одну пачку и обрабатывается одним вызовом.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Generic, Hashable, Optional, TypeVar
+
+from .metrics import metrics
+
+T = TypeVar("T")
+
+
+class RequestCoalescer(Generic[T]):
+    def __init__(self, window: float) -> None:
+        self.window = window
+        self._pending: dict[Hashable, list[T]] = {}
+        self._seq: dict[Hashable, int] = {}
+        self._locks: dict[Hashable, asyncio.Lock] = {}
+        self._users: dict[Hashable, int] = {}
+
+    @asynccontextmanager
+    async def batch(self, key: Hashable, item: T) -> AsyncIterator[Optional[list[T]]]:
+        """
+        Отдаёт пачку запросов, которую должен обработать вызывающий,
+        или None — если его запрос уже забрал в свою пачку более свежий.
+        Пока контекст открыт, другие пачки по этому ключу ждут.
+        """
+        seq = self._seq.get(key, 0) + 1
+        self._seq[key] = seq
+        self._pending.setdefault(key, []).append(item)
+        self._users[key] = self._users.get(key, 0) + 1
+        lock = self._locks.setdefault(key, asyncio.Lock())
+
+        try:
+            if self.window > 0:
+                await asyncio.sleep(self.window)
+
+            # Пришло сообщение новее — пачку заберёт оно
+            if self._seq[key] != seq:
+                metrics.incr("coalescer.merged")
+                yield None
+                return
+
+            async with lock:
+                items = self._pending.pop(key, None)
+                if not items:
+                    # Наш запрос уже ушёл в пачку того, кто держал очередь перед нами
+                    metrics.incr("coalescer.merged")
+                    yield None
+                    return
+
+                metrics.incr("coalescer.batches")
+                metrics.incr("coalescer.saved_calls", len(items) - 1)
+                yield items
+
+        finally:
+            self._users[key] -= 1
+            if not self._users[key]:
+                del self._users[key]
+                del self._locks[key]
+                del self._seq[key]
+                self._pending.pop(key, None)
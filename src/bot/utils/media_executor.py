@@ -0,0 +1,71 @@
+"""
+Media Executor - пул процессов для обработки аудио и изображений
+
+CPU-тяжёлые задачи (pedalboard, soundfile, PIL, imageio) не должны
+выполняться в event loop: пока они идут, бот не отвечает никому.
+Воркеры стартуют заранее и сразу импортируют тяжёлые библиотеки.
+
+Процессы запускаются через spawn на всех ОС (как на Windows): fork скопировал бы
+весь бот вместе с aiogram. При spawn воркер импортирует только пакет media —
+и модуль запуска родителя, если он не ``*.__main__``: multiprocessing выполняет
+его заново как ``__mp_main__``. ``uv run -m src.bot`` (start_bot*.bat) запускает
+``src.bot.__main__``, его multiprocessing не перезапускает. Скрипты, которые
+поднимают пул сами, должны держать код запуска под ``if __name__ == "__main__"``.
+"""
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from loguru import logger
+
+from ...media.jobs import warmup
+from ...settings import config
+from .metrics import metrics
+
+T = TypeVar("T")
+
+
+class MediaExecutor:
+    def __init__(self, workers: int = config.media.workers) -> None:
+        # workers=0 — выполнять прямо в event loop (старое поведение, для сравнения)
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def start(self) -> None:
+        if self._pool is not None or self.workers <= 0:
+            return
+
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=warmup
+        )
+        # Прогреваем все воркеры сразу, а не на первом сообщении
+        for _ in range(self.workers):
+            self._pool.submit(time.sleep, 0)
+        logger.info(f"Пул обработки медиа: {self.workers} процессов")
+
+    async def run(
+            self,
+            name: str,
+            func: Callable[..., T],
+            *args: Any
+    ) -> T:
+        """func должна быть функцией уровня модуля из пакета media (её передают в процесс)."""
+        start = time.perf_counter()
+        try:
+            if self.workers <= 0:
+                return func(*args)
+
+            self.start()
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, func, *args)
+        finally:
+            metrics.observe(f"media.{name}", time.perf_counter() - start)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,98 @@
+"""
+Metrics - простые счётчики и тайминги внутри процесса
+
+Без внешних зависимостей: значения живут в памяти процесса,
+их можно вывести в лог через ``metrics.log_summary()``.
+"""
+import asyncio
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator
+
+from loguru import logger
+
+
+@dataclass
+class Timing:
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    @property
+    def avg(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self.counters: dict[str, int] = {}
+        self.gauges: dict[str, float] = {}
+        self.timings: dict[str, Timing] = {}
+
+    def incr(self, name: str, value: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def gauge(self, name: str, value: float) -> None:
+        self.gauges[name] = value
+
+    def observe(self, name: str, seconds: float) -> None:
+        timing = self.timings.setdefault(name, Timing())
+        timing.count += 1
+        timing.total += seconds
+        timing.max = max(timing.max, seconds)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def ratio(self, hits: str, misses: str) -> float:
+        """Доля попаданий: hits / (hits + misses)."""
+        total = self.counters.get(hits, 0) + self.counters.get(misses, 0)
+        return self.counters.get(hits, 0) / total if total else 0.0
+
+    def snapshot(self) -> dict:
+        return {
+            "counters": dict(self.counters),
+            "gauges": dict(self.gauges),
+            "timings": {
+                name: {"count": t.count, "avg": t.avg, "max": t.max}
+                for name, t in self.timings.items()
+            },
+        }
+
+    def log_summary(self) -> None:
+        for name, value in sorted(self.counters.items()):
+            logger.info(f"📊 {name}: {value}")
+        for name, value in sorted(self.gauges.items()):
+            logger.info(f"📊 {name}: {value}")
+        for name, t in sorted(self.timings.items()):
+            logger.info(
+                f"⏱ {name}: n={t.count} avg={t.avg * 1000:.1f}ms max={t.max * 1000:.1f}ms"
+            )
+
+
+metrics = Metrics()
+
+
+def since_launch(name: str) -> float:
+    """Записывает и логирует время от запуска процесса (импорта пакета bot)."""
+    from .. import launched_at
+
+    elapsed = time.perf_counter() - launched_at
+    metrics.observe(name, elapsed)
+    logger.info(f"⏱ {name}: {elapsed:.2f} с от запуска")
+    return elapsed
+
+
+async def monitor_loop_lag(interval: float = 0.5) -> None:
+    """Фоновая задача: на сколько event loop опаздывает проснуться (loop.lag)."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        metrics.observe("loop.lag", max(0.0, loop.time() - start - interval))
@@ -0,0 +1,155 @@
+"""
+Rate limit - token bucket в памяти процесса
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable
+
+from loguru import logger
+
+from .metrics import metrics
+
+
+class TokenBucket:
+    """
+    Классический token bucket: capacity токенов, пополнение rate токенов в секунду.
+
+    ``try_acquire`` — неблокирующая проверка, ``acquire`` — ждёт, пока токены появятся.
+    ``pause`` — принудительная пауза (например, по RetryAfter от Telegram).
+    """
+
+    def __init__(self, capacity: float, rate: float) -> None:
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(
+            self.capacity,
+            self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+    def delay(self, amount: float = 1) -> float:
+        """Сколько секунд ждать, пока можно будет взять amount токенов."""
+        now = time.monotonic()
+        self._refill(now)
+        wait = max(0.0, self.paused_until - now)
+        if self.tokens < amount:
+            wait = max(wait, (amount - self.tokens) / self.rate)
+        return wait
+
+    def try_acquire(self, amount: float = 1) -> bool:
+        if self.delay(amount) > 0:
+            return False
+        self.tokens -= amount
+        return True
+
+    async def acquire(self, amount: float = 1) -> None:
+        while not self.try_acquire(amount):
+            await asyncio.sleep(self.delay(amount))
+
+    def pause(self, seconds: float) -> None:
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class RateLimiter:
+    """
+    Лимиты на входящие запросы: отдельный bucket на каждого пользователя
+    и один общий на весь бот. Всё в памяти, в базу на каждое сообщение
+    ничего не пишется — время последнего запроса копится в ``pending``
+    и сохраняется пачкой (см. ``UserRepository.save_request_times``).
+
+    Бакеты неактивных пользователей вытесняются по LRU (max_users).
+    """
+
+    def __init__(
+            self,
+            user_capacity: float,
+            user_interval: float,
+            global_capacity: float,
+            global_rate: float,
+            max_users: int = 100_000
+    ) -> None:
+        self.user_capacity = user_capacity
+        self.user_rate = 1 / max(user_interval, 1e-6)
+        self.global_bucket = TokenBucket(global_capacity, global_rate)
+        self.max_users = max_users
+        self._buckets: OrderedDict[int, TokenBucket] = OrderedDict()
+        self._warned: set[int] = set()
+        # user_id -> время последнего пропущенного запроса, ещё не сохранённое в базу
+        self.pending: dict[int, datetime] = {}
+
+    def _bucket(self, user_id: int) -> TokenBucket:
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            bucket = self._buckets[user_id] = TokenBucket(self.user_capacity, self.user_rate)
+            if len(self._buckets) > self.max_users:
+                evicted, _ = self._buckets.popitem(last=False)
+                self._warned.discard(evicted)
+        else:
+            self._buckets.move_to_end(user_id)
+        return bucket
+
+    def check(self, user_id: int) -> float:
+        """
+        0 — запрос можно выполнять (токены уже списаны),
+        иначе — сколько секунд пользователю ждать.
+        """
+        bucket = self._bucket(user_id)
+
+        wait = bucket.delay()
+        if wait > 0:
+            metrics.incr("throttle.user")
+            return wait
+
+        # Общий лимит проверяем после личного, чтобы флудер не тратил общие токены
+        wait = self.global_bucket.delay()
+        if wait > 0:
+            metrics.incr("throttle.global")
+            return wait
+
+        bucket.tokens -= 1
+        self.global_bucket.tokens -= 1
+        self._warned.discard(user_id)
+        self.pending[user_id] = datetime.now()
+        metrics.incr("throttle.passed")
+        return 0.0
+
+    def should_warn(self, user_id: int) -> bool:
+        """Предупреждаем один раз на серию отклонённых запросов, а не на каждый."""
+        if user_id in self._warned:
+            return False
+        self._warned.add(user_id)
+        return True
+
+    async def flush(
+            self,
+            save: Callable[[dict[int, datetime]], Awaitable[Any]]
+    ) -> None:
+        pending, self.pending = self.pending, {}
+        if not pending:
+            return
+        try:
+            await save(pending)
+        except Exception as e:
+            # Не потеряем: вернём в очередь, более свежие значения важнее
+            self.pending = pending | self.pending
+            logger.error(f"Не удалось сохранить время запросов: {e}")
+
+    async def flush_loop(
+            self,
+            save: Callable[[dict[int, datetime]], Awaitable[Any]],
+            interval: float
+    ) -> None:
+        """Фоновая задача: периодически сохраняет накопленное время запросов."""
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                await self.flush(save)
+        finally:
+            await self.flush(save)
@@ -0,0 +1,105 @@
+"""
+TTS Client - клиент локального TTS сервера
+
+Одна долгоживущая aiohttp-сессия с пулом соединений на весь процесс.
+Протокол сервера: POST /api/tts/async -> task_id,
+GET /api/task/{task_id} -> статус, GET /api/download/{file} -> аудио.
+"""
+import asyncio
+import time
+from typing import Optional
+
+import aiohttp
+
+from ...settings import config
+from .metrics import metrics
+
+
+class TtsClient:
+    def __init__(
+            self,
+            base_url: str = config.voice_config.tts_url,
+            spk_id: str = config.voice_config.tts_speaker,
+            timeout: float = config.voice_config.tts_timeout,
+            poll_initial: float = 0.05,
+            poll_max: float = 1.0,
+            connections: int = 20
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.spk_id = spk_id
+        self.timeout = timeout
+        self.poll_initial = poll_initial
+        self.poll_max = poll_max
+        self.connections = connections
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.connections,
+                    keepalive_timeout=60
+                ),
+                timeout=aiohttp.ClientTimeout(
+                    total=self.timeout,
+                    connect=5
+                )
+            )
+        return self._session
+
+    async def synthesize(
+            self,
+            text: str,
+            mode: str = "zero_shot",
+            speed: float = 1.0
+    ) -> bytes:
+        data = {
+            "text": text,
+            "mode": mode,
+            "spk_id": self.spk_id,
+            "speed": speed,
+        }
+
+        # 1. Отправляем запрос на создание задачи (POST)
+        with metrics.timer("tts.submit"):
+            async with self.session.post(f"{self.base_url}/api/tts/async", data=data) as response:
+                response.raise_for_status()
+                result = await response.json()
+                task_id = result["task_id"]
+
+        # 2. Ожидаем завершения задачи: частый опрос вначале, потом реже
+        with metrics.timer("tts.wait"):
+            filename = await self._wait(task_id)
+
+        # 3. Скачиваем готовый файл (GET)
+        with metrics.timer("tts.download"):
+            async with self.session.get(f"{self.base_url}/api/download/{filename}") as response:
+                response.raise_for_status()
+                return await response.read()
+
+    async def _wait(self, task_id: str) -> str:
+        delay = self.poll_initial
+        deadline = time.monotonic() + self.timeout
+
+        while True:
+            async with self.session.get(f"{self.base_url}/api/task/{task_id}") as response:
+                response.raise_for_status()
+                status_data = await response.json()
+            metrics.incr("tts.polls")
+
+            if status_data["status"] == "completed":
+                return status_data["output_file"]
+            if status_data["status"] == "failed":
+                raise RuntimeError(status_data.get("error", "Unknown error"))
+
+            if time.monotonic() + delay > deadline:
+                raise asyncio.TimeoutError(f"TTS задача {task_id} не завершилась за {self.timeout} сек")
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 1.5, self.poll_max)
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
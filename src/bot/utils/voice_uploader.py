@@ -0,0 +1,52 @@
+"""
+Voice Uploader - отправка голосовых с повторным использованием file_id
+
+Первый раз клип загружается в Telegram байтами, полученный file_id
+запоминается (по sha256 содержимого) и дальше отправляется вместо байтов.
+"""
+from typing import Any, Awaitable, Callable
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import BufferedInputFile, Message
+
+from .audio_cache import AudioCache
+from .metrics import metrics
+
+
+class VoiceUploader:
+    def __init__(self, audio_cache: AudioCache) -> None:
+        self.audio_cache = audio_cache
+
+    async def send(
+            self,
+            send: Callable[..., Awaitable[Message]],
+            voice: bytes,
+            filename: str = "voice.mp3",
+            **kwargs: Any
+    ) -> Message:
+        """
+        send — метод отправки голосового: message.reply_voice, bot.send_voice и т.п.
+        kwargs передаются в него как есть (chat_id, caption, reply_markup...).
+        """
+        digest = self.audio_cache.digest(voice)
+        file_id = await self.audio_cache.get_file_id(digest)
+
+        if file_id:
+            try:
+                result = await send(voice=file_id, **kwargs)
+                metrics.incr("voice_upload.reused")
+                return result
+            except TelegramBadRequest:
+                # file_id протух или относится к другому типу файла — загружаем заново
+                await self.audio_cache.set_file_id(digest, None)
+
+        result = await send(
+            voice=BufferedInputFile(file=voice, filename=filename),
+            **kwargs
+        )
+        metrics.incr("voice_upload.uploaded")
+        metrics.incr("voice_upload.bytes", len(voice))
+
+        if result.voice:
+            await self.audio_cache.set_file_id(digest, result.voice.file_id)
+        return result
@@ -0,0 +1,89 @@
+"""
+Webhook - приём апдейтов через aiohttp вместо long polling
+
+Telegram сам присылает апдейты POST-запросом на WEBHOOK_BASE_URL + WEBHOOK_PATH,
+подлинность проверяется по заголовку X-Telegram-Bot-Api-Secret-Token.
+Без секрета бот не принимает апдейты: если WEBHOOK_SECRET не задан, а вебхук
+выставляет сам бот, секрет генерируется при каждом запуске.
+Несколько экземпляров можно поставить за балансировщиком.
+"""
+import asyncio
+import secrets
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+from loguru import logger
+
+from ..settings.main import config
+
+
+def create_app(
+        dp: Dispatcher,
+        bot: Bot,
+        secret: str,
+        path: str = config.webhook.path,
+        handle_in_background: bool = config.webhook.handle_in_background
+) -> web.Application:
+    """
+    aiohttp приложение с обработчиком апдейтов на path.
+    startup/shutdown диспетчера привязаны к жизненному циклу приложения.
+    """
+    if not secret:
+        # Иначе любой, кто узнал адрес, шлёт апдейты от имени любого пользователя
+        raise ValueError("Webhook без секрета принимает апдейты от кого угодно")
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        handle_in_background=handle_in_background,
+        secret_token=secret
+    ).register(app, path=path)
+    setup_application(app, dp, bot=bot)
+    return app
+
+
+async def run_webhook(
+        dp: Dispatcher,
+        bot: Bot,
+        allowed_updates: list[str]
+) -> None:
+    webhook = config.webhook
+    secret = webhook.secret.get_secret_value() if webhook.secret else None
+    if not secret:
+        if not webhook.base_url:
+            raise RuntimeError(
+                "WEBHOOK_SECRET не задан: без него вебхук, выставленный снаружи, "
+                "принимает апдейты от кого угодно"
+            )
+        # Вебхук выставляем сами — Telegram узнает секрет из set_webhook
+        secret = secrets.token_urlsafe(32)
+        logger.info("WEBHOOK_SECRET не задан, сгенерирован секрет на этот запуск")
+    url = webhook.base_url.rstrip("/") + webhook.path
+
+    async def register_webhook() -> None:
+        await bot.set_webhook(
+            url=url,
+            secret_token=secret,
+            allowed_updates=allowed_updates,
+            drop_pending_updates=True,
+            max_connections=webhook.max_connections
+        )
+        logger.success(f"✅ Webhook установлен: {url}")
+
+    if webhook.base_url:
+        dp.startup.register(register_webhook)
+    else:
+        # Вебхук уже выставлен снаружи (или это локальный стенд)
+        logger.warning("WEBHOOK_BASE_URL не задан, set_webhook не вызывается")
+
+    runner = web.AppRunner(create_app(dp, bot, path=webhook.path, secret=secret))
+    await runner.setup()
+    site = web.TCPSite(runner, host=webhook.host, port=webhook.port)
+    await site.start()
+    logger.info(f"Слушаю webhook на {webhook.host}:{webhook.port}{webhook.path}")
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
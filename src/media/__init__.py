@@ -0,0 +1,8 @@
+"""
+Media - CPU-тяжёлая обработка аудио и изображений.
+
+Пакет намеренно лежит вне ``bot`` и ничего из него не импортирует: функции
+отсюда выполняются в процессах пула (MediaExecutor), и их импорт не должен
+тянуть за собой aiogram, агента и настройки бота. Что ещё импортирует
+воркер при spawn — см. media_executor.
+"""
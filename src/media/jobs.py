@@ -0,0 +1,41 @@
+"""
+Задачи для пула процессов: принимают и возвращают только bytes/простые типы,
+чтобы дёшево передаваться между процессами.
+"""
+from typing import Optional
+
+
+def warmup() -> None:
+    """Инициализатор воркера: тяжёлые библиотеки импортируются один раз заранее."""
+    import imageio.v3  # noqa: F401
+    import numpy  # noqa: F401
+    import pedalboard  # noqa: F401
+    import soundfile  # noqa: F401
+    from PIL import Image  # noqa: F401
+
+    from .effects import get_board
+
+    get_board("default")
+
+
+def apply_voice_effect(
+        voice_bytes: bytes,
+        preset: str = "default",
+        codec: Optional[str] = None
+) -> bytes:
+    from .effects import apply
+
+    return apply(voice_bytes, preset=preset, codec=codec)
+
+
+def prepare_image(
+        data: bytes,
+        is_video: bool,
+        max_side: int,
+        fmt: str,
+        quality: int
+) -> Optional[bytes]:
+    """Фото/стикер (WEBP, первый кадр WEBM) -> уменьшенный JPEG/WEBP для vision-модели."""
+    from .images import prepare_image
+
+    return prepare_image(data, is_video, max_side, fmt, quality)
@@ -31,6 +31,17 @@ class VoiceConfig(BaseConfig):
     edge_tts: SecretStr | None = Field(default=None)
     rvc: SecretStr | None = None
     voice_mode_enabled: bool = Field(default=False)  # Включить voice_mode по умолчанию для всех
+    # Локальный TTS сервер (edge_voice_generate)
+    tts_url: str = Field(default="http://127.0.0.1:8000")
+    tts_speaker: str = Field(default="d3311f8f9ffe")
+    tts_timeout: float = Field(default=60)  # секунд на всю генерацию
+    # Кэш готовых голосовых на диске
+    cache_dir: str = Field(default="cache/voice")
+    cache_max_mb: int = Field(default=512)
+    # Где держать голосовые, ожидающие отправки в канал: memory или disk
+    blob_store: str = Field(default="memory")
+    blob_ttl: float = Field(default=3600)  # секунд
+    blob_dir: str = Field(default="cache/blobs")
 
 class AiConfig(BaseConfig):
     model_config = SettingsConfigDict(
@@ -47,6 +58,98 @@ class AiConfig(BaseConfig):
     tokens_per_request: int = Field(default=200) 
     subscription_weekly_tokens: int = Field(default=2000) 
     subscription_monthly_tokens: int = Field(default=10000)
+    # Сколько агентов (по пользователям) держать в памяти
+    agent_cache_size: int = Field(default=256)
+    # Сколько генераций может идти одновременно
+    max_concurrency: int = Field(default=64)
+    # Стриминг ответа правками сообщения в Telegram
+    stream_replies: bool = Field(default=False)
+    stream_edit_interval: float = Field(default=1.5)  # секунд между правками
+    # Сообщения одного пользователя за это окно склеиваются в один запрос
+    coalesce_window: float = Field(default=0.4)  # секунд
+    # Бюджет контекста: промпт + summary + история, в токенах
+    context_token_budget: int = Field(default=6000)
+    max_history_runs: int = Field(default=50)
+    # Размеры истории по сессиям для подсчёта бюджета (LRU + TTL)
+    context_cache_size: int = Field(default=1024)
+    context_cache_ttl: float = Field(default=3600)  # секунд
+
+
+class MailingConfig(BaseConfig):
+    model_config = SettingsConfigDict(
+        env_prefix="mailing_"
+    )
+
+    rate: float = Field(default=25)  # сообщений в секунду на всю рассылку (лимит Telegram ~30)
+    workers: int = Field(default=20)  # одновременных отправок
+    checkpoint_every: int = Field(default=500)  # пользователей между сохранениями прогресса
+    lease: float = Field(default=300)  # секунд аренды рассылки: столько ждут, если её владелец упал
+
+
+class MediaConfig(BaseConfig):
+    model_config = SettingsConfigDict(
+        env_prefix="media_"
+    )
+
+    workers: int = Field(default=2)  # процессов для эффектов/картинок, 0 — в event loop
+    voice_preset: str = Field(default="default")  # пресет эффектов из media/effects.py
+    voice_codec: str = Field(default="OPUS")  # OPUS — формат голосовых Telegram, VORBIS — в 3–4 раза быстрее
+    # Картинки для vision-модели
+    image_max_side: int = Field(default=1024)  # пикселей по большей стороне
+    image_format: str = Field(default="JPEG")  # JPEG или WEBP
+    image_quality: int = Field(default=85)
+    image_cache_size: int = Field(default=512)  # готовых фото по file_unique_id
+    # Стикеры: кэш картинок (в памяти + Mongo) и описания от модели вместо картинки
+    sticker_cache_size: int = Field(default=1024)
+    sticker_descriptions: bool = Field(default=False)
+
+
+class ThrottleConfig(BaseConfig):
+    model_config = SettingsConfigDict(
+        env_prefix="throttle_"
+    )
+
+    enabled: bool = Field(default=True)
+    # На пользователя: запас запросов подряд и интервал пополнения (как UserSettings.min_request_interval).
+    # Лимит считает сообщения до RequestCoalescer: альбом (до 10 сообщений) или пачка
+    # пересланных приходят разом и склеиваются в один запрос к ИИ — запас должен их вмещать
+    user_burst: float = Field(default=10)
+    user_interval: float = Field(default=2)  # секунд на один запрос
+    # На весь бот: сколько запросов в секунду отдаём в ИИ и запас на всплески
+    global_rate: float = Field(default=20)
+    global_burst: float = Field(default=60)
+    max_users: int = Field(default=100_000)  # бакетов в памяти (LRU)
+    flush_interval: float = Field(default=60)  # секунд между сохранениями last_request_time
+
+
+class WebhookConfig(BaseConfig):
+    model_config = SettingsConfigDict(
+        env_prefix="webhook_"
+    )
+
+    enabled: bool = Field(default=False)  # false — long polling
+    base_url: str = Field(default="")  # публичный адрес, например https://bot.example.com
+    path: str = Field(default="/webhook")
+    host: str = Field(default="0.0.0.0")
+    port: int = Field(default=8080)
+    secret: SecretStr | None = Field(default=None)  # X-Telegram-Bot-Api-Secret-Token
+    max_connections: int = Field(default=40)  # параллельных запросов от Telegram
+    # true — отвечать Telegram сразу, обработка в фоне; false — после хендлера
+    handle_in_background: bool = Field(default=True)
+
+
+class ShardConfig(BaseConfig):
+    model_config = SettingsConfigDict(
+        env_prefix="shard_"
+    )
+
+    workers: int = Field(default=0)  # процессов-обработчиков, 0 — всё в одном процессе
+    queue_size: int = Field(default=10000)  # апдейтов в очереди воркера
+    max_in_flight: int = Field(default=256)  # апдейтов одновременно в одном воркере
+    max_per_user: int = Field(default=16)  # апдейтов одного пользователя одновременно
+    max_queued_per_user: int = Field(default=100)  # апдейтов пользователя в очереди, лишние отбрасываются
+    blocked_refresh: float = Field(default=30)  # секунд между перечитыванием заблокированных
+    shutdown_timeout: float = Field(default=30)  # секунд на завершение воркера
 
 
 class DbConfig(BaseConfig):
@@ -56,6 +159,16 @@ class DbConfig(BaseConfig):
 
     url: str = Field(default="mongodb://localhost:27017")
     name: str = Field(default="my_database")
+    # Кэш пользователей в памяти
+    user_cache_size: int = Field(default=10000)
+    user_cache_ttl: float = Field(default=300)  # секунд
+    locale_cache_size: int = Field(default=100000)  # локалей пользователей в памяти (для i18n)
+    # FSM (/voice, /voice_mode) в коллекции fsm
+    fsm_collection: str = Field(default="fsm")
+    fsm_ttl: int = Field(default=86400)  # секунд без изменений до удаления состояния
+    fsm_flush_interval: float = Field(default=1.0)  # секунд копить изменения, 0 — писать сразу
+    fsm_cache: bool = Field(default=True)  # false — если апдейты пользователя идут в разные процессы
+    fsm_cache_size: int = Field(default=10000)
 
 
 class Config(BaseSettings):
@@ -71,6 +184,21 @@ class Config(BaseSettings):
     db: DbConfig = Field(
         default_factory=DbConfig
     )
+    mailing: MailingConfig = Field(
+        default_factory=MailingConfig
+    )
+    media: MediaConfig = Field(
+        default_factory=MediaConfig
+    )
+    throttle: ThrottleConfig = Field(
+        default_factory=ThrottleConfig
+    )
+    webhook: WebhookConfig = Field(
+        default_factory=WebhookConfig
+    )
+    shard: ShardConfig = Field(
+        default_factory=ShardConfig
+    )
 
     @classmethod
     def load(cls) -> Self: